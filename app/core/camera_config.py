@@ -0,0 +1,88 @@
+import json
+import os
+from pathlib import Path
+from app.core.config import BASE_DIR
+
+# Cameras are declared in a JSON list, e.g.
+# [
+#   {"id": "tray-1", "source": 0, "roi_area_cm2": 413, "density_threshold": 1.25},
+#   {"id": "tray-2", "source": 1, "roi_area_cm2": 520,
+#    "roi_polygon": [[80, 40], [560, 40], [560, 440], [80, 440]]}
+# ]
+# (see cameras.example.json). Without the file a single "default" camera on
+# device 0 is used. roi_polygon (frame pixels) limits inference to the tray;
+# roi_area_cm2 is the physical area inside it. ROIs can be edited through
+# /api/cameras/{id}/roi, which writes this file back.
+CAMERAS_FILE = Path(os.getenv("CAMERAS_FILE", str(BASE_DIR / "cameras.json")))
+
+
+class CameraConfig:
+    # Per-camera defaults (8x8 inch tray, fixed camera height)
+    DEFAULTS = {
+        "source": 0,
+        "roi_area_cm2": 413,
+        "avg_worm_area": 386,
+        "density_threshold": 1.25,
+        "roi_polygon": None
+    }
+
+    @staticmethod
+    def normalize(camera):
+        """Fill in defaults; numeric sources ("0", 1) become device indexes"""
+        camera = {**CameraConfig.DEFAULTS, **camera}
+        camera["id"] = str(camera["id"])
+
+        source = camera["source"]
+        if isinstance(source, str) and source.isdigit():
+            camera["source"] = int(source)
+        return camera
+
+    @staticmethod
+    def validate_roi(polygon, area_cm2, frame_size=None):
+        """
+        Raise ValueError for an unusable ROI (polygon may be None = whole frame).
+        With frame_size (w, h) every point must lie inside the frame.
+        """
+        if area_cm2 is None or area_cm2 <= 0:
+            raise ValueError("area_cm2 must be positive")
+        if polygon is None:
+            return
+        if len(polygon) < 3:
+            raise ValueError("roi polygon needs at least 3 points")
+        for point in polygon:
+            if len(point) != 2 or min(point) < 0:
+                raise ValueError("roi polygon points must be [x, y] pixel pairs")
+            if frame_size and (point[0] >= frame_size[0] or point[1] >= frame_size[1]):
+                raise ValueError(f"roi polygon point {list(point)} is outside the "
+                                 f"{frame_size[0]}x{frame_size[1]} frame")
+
+    @staticmethod
+    def save(cameras):
+        """Write the cameras back to the cameras file (atomically)"""
+        tmp_path = CAMERAS_FILE.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(cameras, indent=2))
+        tmp_path.replace(CAMERAS_FILE)
+        print(f"💾 Saved {len(cameras)} camera(s) to {CAMERAS_FILE.name}")
+
+    @staticmethod
+    def load():
+        """Return the configured cameras (first one is the default camera)"""
+        if not CAMERAS_FILE.exists():
+            return [CameraConfig.normalize({"id": "default"})]
+
+        try:
+            cameras = json.loads(CAMERAS_FILE.read_text())
+        except Exception as e:
+            print(f"❌ Failed to read {CAMERAS_FILE.name}: {e}")
+            raise
+
+        if not cameras:
+            raise ValueError(f"{CAMERAS_FILE.name} declares no cameras")
+
+        cameras = [CameraConfig.normalize(c) for c in cameras]
+        ids = [c["id"] for c in cameras]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate camera ids in {CAMERAS_FILE.name}")
+
+        print(f"📷 Loaded {len(cameras)} camera(s): {', '.join(ids)}")
+        return cameras
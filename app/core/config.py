@@ -0,0 +1,109 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load .env file
+load_dotenv()
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+MODELS_DIR = BASE_DIR / "app" / "yolo" / "models" / "trained"
+
+# Weights used by each model role (file name inside MODELS_DIR or absolute path).
+# Point both roles at the same file to keep a single model in memory.
+LIVE_MODEL = os.getenv("LIVE_MODEL", "wormv11-seg-final.pt")
+NOTIFY_MODEL = os.getenv("NOTIFY_MODEL", "segmentv3.pt")
+
+# CPU inference backend: pytorch | onnx | openvino (exports made by
+# app/yolo/scripts/export-models.py). INFERENCE_INT8=1 picks the INT8 export.
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "pytorch").lower()
+INFERENCE_INT8 = os.getenv("INFERENCE_INT8", "0") == "1"
+
+# Load models in the background on startup instead of on the first frame
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+
+# Live stream pacing: frames processed per second (upper bound)
+TARGET_FPS = float(os.getenv("TARGET_FPS", "30"))
+
+# Keyframe mode: run YOLO every N frames (1 = every frame) and track masks in between.
+# A keyframe is forced early when the mean pixel change since the last one exceeds
+# MOTION_THRESHOLD (0-255 grayscale).
+KEYFRAME_INTERVAL = int(os.getenv("KEYFRAME_INTERVAL", "1"))
+MOTION_THRESHOLD = float(os.getenv("MOTION_THRESHOLD", "8"))
+
+# Supabase persistence: calls run on a small thread pool off the event loop, inserts
+# are written to a local SQLite outbox first and flushed in batches (write-behind).
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "4"))
+WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", "2"))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))
+DATA_DIR = Path(os.getenv("DATA_DIR", str(BASE_DIR / "data")))
+OUTBOX_PATH = DATA_DIR / "outbox.sqlite3"
+
+# Bulk deletes: rows / storage objects per request and requests in flight
+DELETE_CHUNK_SIZE = int(os.getenv("DELETE_CHUNK_SIZE", "100"))
+DELETE_CONCURRENCY = int(os.getenv("DELETE_CONCURRENCY", "4"))
+
+# Listing APIs: seconds a page of notifications / images is served from memory
+READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", "5"))
+
+# Live pipeline stages: capture (one thread per camera) -> inference -> render/encode.
+# Stages are connected by a bounded queue of STAGE_QUEUE_SIZE frames (oldest dropped).
+# Extra inference workers help with several cameras but need INFERENCE_PROCESSES=1
+# (the in-process model is not thread-safe, so it runs one worker); extra render
+# workers let plotting / encoding of one frame overlap the next.
+# JPEG_ENCODER: auto | turbojpeg | cv2
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+STAGE_QUEUE_SIZE = int(os.getenv("STAGE_QUEUE_SIZE", "4"))
+JPEG_ENCODER = os.getenv("JPEG_ENCODER", "auto").lower()
+
+# INFERENCE_PROCESSES=1: every inference worker drives its own detector process
+# (frames go through a shared-memory ring sized for INFERENCE_MAX_FRAME WxH frames).
+# INFERENCE_PROCESS_THREADS caps torch threads per process (0 = torch default).
+INFERENCE_PROCESSES = os.getenv("INFERENCE_PROCESSES", "0") == "1"
+INFERENCE_MAX_FRAME = tuple(int(v) for v in os.getenv("INFERENCE_MAX_FRAME", "1920x1080").lower().split("x"))
+INFERENCE_PROCESS_THREADS = int(os.getenv("INFERENCE_PROCESS_THREADS", "0"))
+
+# Tiled inference for small larvae: TILE_SIZE > 0 splits each frame (or ROI crop) into
+# overlapping TILE_SIZE x TILE_SIZE pixel tiles, all run at imgsz 640 in one batched call.
+# TILE_OVERLAP is the fraction of a tile shared with its neighbour; detections repeated
+# across a seam are merged when their masks overlap by more than TILE_MERGE_OVERLAP
+# (intersection over the smaller mask).
+TILE_SIZE = int(os.getenv("TILE_SIZE", "0"))
+TILE_OVERLAP = float(os.getenv("TILE_OVERLAP", "0.2"))
+TILE_MERGE_OVERLAP = float(os.getenv("TILE_MERGE_OVERLAP", "0.5"))
+
+# Video renditions viewers can pick (?rendition=): name -> (width, height, JPEG quality).
+# Each one is encoded at most once per frame, and only while someone watches it.
+RENDITIONS = {
+    "low": (320, 240, 50),
+    "medium": (640, 480, 70),
+    "high": (960, 720, 85),
+}
+DEFAULT_RENDITION = os.getenv("DEFAULT_RENDITION", "medium")
+
+# Video viewers: frames queued per viewer before the oldest is dropped, and seconds a
+# single send may take before the viewer is considered stalled and disconnected
+CLIENT_QUEUE_SIZE = int(os.getenv("CLIENT_QUEUE_SIZE", "2"))
+CLIENT_STALL_TIMEOUT = float(os.getenv("CLIENT_STALL_TIMEOUT", "10"))
+
+# Overlay mode (/ws/camera?mode=overlay): mask polygons are simplified to within
+# this many pixels of the sent 640x480 frame before they go on the wire
+OVERLAY_SIMPLIFY_PX = float(os.getenv("OVERLAY_SIMPLIFY_PX", "1.5"))
+
+# Density history: stats samples are buffered in memory and flushed to local
+# 1 s / 1 min / 1 h rollups every HISTORY_FLUSH_INTERVAL seconds
+HISTORY_PATH = DATA_DIR / "stats_history.sqlite3"
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "5"))
+
+# Offline batch analysis (app/yolo/scripts/batch-analyze.py, POST /api/analysis):
+# frames are decoded ahead by ANALYSIS_PREFETCH batches, run ANALYSIS_BATCH_SIZE at a
+# time on ANALYSIS_WORKERS inference processes (0 = in the calling process), and
+# results + checkpoint are flushed every ANALYSIS_CHECKPOINT_ROWS frames. The job
+# endpoint reads footage under ANALYSIS_INPUT_DIR and writes to ANALYSIS_OUTPUT_DIR.
+ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "8"))
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "1"))
+ANALYSIS_PREFETCH = int(os.getenv("ANALYSIS_PREFETCH", "4"))
+ANALYSIS_CHECKPOINT_ROWS = int(os.getenv("ANALYSIS_CHECKPOINT_ROWS", "500"))
+ANALYSIS_INPUT_DIR = Path(os.getenv("ANALYSIS_INPUT_DIR", str(DATA_DIR / "recordings")))
+ANALYSIS_OUTPUT_DIR = Path(os.getenv("ANALYSIS_OUTPUT_DIR", str(DATA_DIR / "analysis")))
+
@@ -0,0 +1,124 @@
+import threading
+import time
+from bisect import bisect_left
+
+
+class Metrics:
+    """
+    Hand-rolled Prometheus metrics (text exposition format, served at /metrics).
+    Counters and histograms are updated in place on the hot path (one lock,
+    a bisect and two adds); gauges that mirror service state are produced at
+    scrape time by collectors, so they cost nothing between scrapes.
+    """
+
+    # Latency buckets in seconds, from 1 ms (encode) up to 5 s (Supabase round-trips)
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    HELP = {
+        "worm_stage_seconds": ("histogram", "Frame path stage latency (capture, decode, inference, encode, ...)"),
+        "worm_ws_send_seconds": ("histogram", "Time to send one websocket message"),
+        "worm_ws_connections": ("gauge", "Open websocket connections"),
+        "worm_client_queue_depth": ("gauge", "Frames waiting in a video client's send queue"),
+        "worm_client_dropped_frames_total": ("counter", "Frames dropped because a video client fell behind"),
+        "worm_client_stalls_total": ("counter", "Video clients disconnected because a send stalled"),
+        "worm_notification_cooldown_seconds": ("gauge", "Seconds left before a camera may alert again (0 = ready)"),
+        "worm_notifications_sent_total": ("counter", "Density alerts sent"),
+        "worm_supabase_seconds": ("histogram", "Supabase call latency"),
+        "worm_supabase_errors_total": ("counter", "Failed Supabase calls"),
+        "worm_outbox_dead_letters_total": ("counter", "Outbox rows Supabase rejected permanently (moved to dead_letter)"),
+    }
+
+    _lock = threading.Lock()
+    _histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+    _values = {}      # (name, labels) -> counter / gauge value
+    _collectors = []
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    @staticmethod
+    def observe(name: str, seconds: float, **labels):
+        """Record one sample in a histogram"""
+        key = Metrics._key(name, labels)
+        index = bisect_left(Metrics.BUCKETS, seconds)
+        with Metrics._lock:
+            histogram = Metrics._histograms.get(key)
+            if histogram is None:
+                histogram = Metrics._histograms[key] = [0] * (len(Metrics.BUCKETS) + 2)
+            histogram[index] += 1
+            histogram[-1] += seconds
+
+    @staticmethod
+    def inc(name: str, amount=1, **labels):
+        """Add to a counter (or an up/down gauge such as open connections)"""
+        key = Metrics._key(name, labels)
+        with Metrics._lock:
+            Metrics._values[key] = Metrics._values.get(key, 0) + amount
+
+    @staticmethod
+    def timed(name: str, fn, *args, **labels):
+        """Call fn(*args) and record its latency in histogram name"""
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            Metrics.observe(name, time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def collector(fn):
+        """
+        Register fn() -> iterable of (name, labels dict, value), called on every
+        scrape for gauges read from service state.
+        """
+        Metrics._collectors.append(fn)
+        return fn
+
+    @staticmethod
+    def _labels(labels, extra=None):
+        pairs = list(labels) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+    @staticmethod
+    def render() -> str:
+        """All metrics in Prometheus text exposition format"""
+        with Metrics._lock:
+            histograms = {key: list(h) for key, h in Metrics._histograms.items()}
+            values = dict(Metrics._values)
+
+        for collect in Metrics._collectors:
+            try:
+                for name, labels, value in collect():
+                    values[Metrics._key(name, labels)] = value
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+
+        by_name = {}
+        for (name, labels), histogram in histograms.items():
+            by_name.setdefault(name, []).append((labels, histogram))
+        for (name, labels), value in values.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            kind, help_text = Metrics.HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for labels, sample in sorted(by_name[name], key=lambda s: s[0]):
+                if kind != "histogram":
+                    lines.append(f"{name}{Metrics._labels(labels)} {sample}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(Metrics.BUCKETS, sample):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{Metrics._labels(labels, ('le', bound))} {cumulative}")
+                cumulative += sample[-2]
+                lines.append(f"{name}_bucket{Metrics._labels(labels, ('le', '+Inf'))} {cumulative}")
+                lines.append(f"{name}_sum{Metrics._labels(labels)} {sample[-1]}")
+                lines.append(f"{name}_count{Metrics._labels(labels)} {cumulative}")
+
+        return "\n".join(lines) + "\n"
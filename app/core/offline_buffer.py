@@ -0,0 +1,81 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+
+class OfflineBuffer:
+    """
+    Local SQLite outbox for rows that still have to reach Supabase.
+    Rows survive uplink drops and restarts until they are flushed. Rows the
+    server rejects for good are moved to a dead_letter table for inspection,
+    so they do not block the rows queued behind them.
+    """
+
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " table_name TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created_at TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letter ("
+            " id INTEGER PRIMARY KEY,"
+            " table_name TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " created_at TEXT NOT NULL,"
+            " error TEXT NOT NULL,"
+            " failed_at TEXT NOT NULL)"
+        )
+
+    def add(self, table, row):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO outbox (table_name, payload, created_at) VALUES (?, ?, ?)",
+                (table, json.dumps(row), datetime.now().isoformat())
+            )
+
+    def fetch(self, limit):
+        """Oldest pending rows as [(id, table, row)]"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, table_name, payload FROM outbox ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [(row_id, table, json.loads(payload)) for row_id, table, payload in rows]
+
+    def delete(self, ids):
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def bury(self, row_id, error):
+        """Move a row the server will never accept from the outbox to dead_letter"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO dead_letter (id, table_name, payload, created_at, error, failed_at)"
+                    " SELECT id, table_name, payload, created_at, ?, ? FROM outbox WHERE id = ?",
+                    (str(error), datetime.now().isoformat(), row_id)
+                )
+                self._conn.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def dead_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReadCache:
+    """
+    Short-TTL cache for list queries, namespaced per table.
+    Writers call invalidate(table) so readers never see stale rows for longer
+    than it takes the write to land. Expired entries are dropped when seen or
+    on the next put, and each table keeps at most MAX_ENTRIES (least recently
+    used go first), so distinct cursors / time windows cannot pile up.
+    """
+
+    MAX_ENTRIES = 256  # per table
+
+    _lock = threading.Lock()
+    _entries = {}  # table -> OrderedDict {key: (expires_at, value)}, oldest use first
+
+    @staticmethod
+    def get(table, key):
+        now = time.monotonic()
+        with ReadCache._lock:
+            entries = ReadCache._entries.get(table)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None:
+                return None
+            if entry[0] < now:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+        return entry[1]
+
+    @staticmethod
+    def put(table, key, value, ttl):
+        now = time.monotonic()
+        with ReadCache._lock:
+            entries = ReadCache._entries.setdefault(table, OrderedDict())
+            for stale in [k for k, (expires_at, _) in entries.items() if expires_at < now]:
+                del entries[stale]
+            entries[key] = (now + ttl, value)
+            entries.move_to_end(key)
+            while len(entries) > ReadCache.MAX_ENTRIES:
+                entries.popitem(last=False)
+
+    @staticmethod
+    def invalidate(table):
+        with ReadCache._lock:
+            ReadCache._entries.pop(table, None)
@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+
+
+class StatsStore:
+    """
+    Local SQLite store of density history as 1 s / 1 min / 1 h rollups.
+    Each row keeps min / sum / max and the sample count, so buckets from
+    later flushes merge into existing ones and the mean stays exact.
+    """
+
+    RESOLUTIONS = {"1s": 1, "1m": 60, "1h": 3600}
+    # How long each resolution is kept (seconds); None = forever
+    RETENTION = {1: 24 * 3600, 60: 30 * 24 * 3600, 3600: None}
+
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rollup ("
+            " resolution INTEGER NOT NULL,"
+            " camera_id TEXT NOT NULL,"
+            " bucket INTEGER NOT NULL,"
+            " n INTEGER NOT NULL,"
+            " count_min REAL, count_sum REAL, count_max REAL,"
+            " density_min REAL, density_sum REAL, density_max REAL,"
+            " PRIMARY KEY (resolution, camera_id, bucket))"
+        )
+        self._conn.commit()
+
+    def add_samples(self, camera_id, samples):
+        """
+        Merge raw samples [(timestamp, count, density_cm2)] into every resolution.
+        """
+        if not samples:
+            return
+
+        rows = []
+        for resolution in self.RESOLUTIONS.values():
+            buckets = {}
+            for timestamp, count, density in samples:
+                bucket = int(timestamp // resolution) * resolution
+                b = buckets.get(bucket)
+                if b is None:
+                    buckets[bucket] = [1, count, count, count, density, density, density]
+                else:
+                    b[0] += 1
+                    b[1] = min(b[1], count)
+                    b[2] += count
+                    b[3] = max(b[3], count)
+                    b[4] = min(b[4], density)
+                    b[5] += density
+                    b[6] = max(b[6], density)
+            rows.extend((resolution, camera_id, bucket, *b) for bucket, b in buckets.items())
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (resolution, camera_id, bucket) DO UPDATE SET "
+                " n = n + excluded.n,"
+                " count_min = min(count_min, excluded.count_min),"
+                " count_sum = count_sum + excluded.count_sum,"
+                " count_max = max(count_max, excluded.count_max),"
+                " density_min = min(density_min, excluded.density_min),"
+                " density_sum = density_sum + excluded.density_sum,"
+                " density_max = max(density_max, excluded.density_max)",
+                rows
+            )
+            self._conn.commit()
+
+    def prune(self, now):
+        """Drop rollups older than their resolution's retention"""
+        with self._lock:
+            for resolution, keep in self.RETENTION.items():
+                if keep is not None:
+                    self._conn.execute(
+                        "DELETE FROM rollup WHERE resolution = ? AND bucket < ?",
+                        (resolution, int(now - keep))
+                    )
+            self._conn.commit()
+
+    def query(self, camera_id, resolution, since, until, limit):
+        """Rollup points (oldest first) for one camera between since and until (unix seconds)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT bucket, n, count_min, count_sum, count_max,"
+                " density_min, density_sum, density_max FROM rollup"
+                " WHERE resolution = ? AND camera_id = ? AND bucket >= ? AND bucket < ?"
+                " ORDER BY bucket DESC LIMIT ?",
+                (resolution, camera_id, int(since), int(until), limit)
+            ).fetchall()
+
+        return [
+            {
+                "bucket": bucket,
+                "samples": n,
+                "count_min": count_min,
+                "count_mean": round(count_sum / n, 2),
+                "count_max": count_max,
+                "density_min": density_min,
+                "density_mean": round(density_sum / n, 4),
+                "density_max": density_max
+            }
+            for bucket, n, count_min, count_sum, count_max, density_min, density_sum, density_max
+            in reversed(rows)
+        ]
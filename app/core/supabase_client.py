@@ -1,6 +1,10 @@
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client
 from dotenv import load_dotenv
+from app.core.config import SUPABASE_POOL_SIZE
+from app.core.metrics import Metrics
 
 # Load .env file
 load_dotenv()
@@ -9,3 +13,21 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# supabase-py is synchronous - every call from async code goes through this pool
+# so a slow round-trip never blocks the event loop (and the video stream).
+supabase_executor = ThreadPoolExecutor(max_workers=SUPABASE_POOL_SIZE, thread_name_prefix="supabase")
+
+async def run_supabase(fn, *args):
+    """Run a blocking Supabase call on the pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(supabase_executor, _timed_call, fn, *args)
+
+def _timed_call(fn, *args):
+    """Record latency / errors of one Supabase call for /metrics"""
+    op = getattr(fn, "__qualname__", "call")
+    try:
+        return Metrics.timed("worm_supabase_seconds", fn, *args, op=op)
+    except Exception:
+        Metrics.inc("worm_supabase_errors_total", op=op)
+        raise
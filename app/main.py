@@ -1,7 +1,7 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from zeroconf import ServiceInfo, Zeroconf
 import socket
@@ -11,6 +11,20 @@ from app.routes.notify_ws import router as notify_router
 from app.api.ip_handler import router as api_router
 from app.routes.delete_images_route import router as delete_images_router
 from app.routes.delete_notifications import router as delete_notifications_router
+from app.routes.models_route import router as models_router
+from app.routes.jobs_route import router as jobs_router
+from app.routes.notifications_route import router as notifications_router
+from app.routes.images_route import router as images_router
+from app.routes.history_route import router as history_router
+from app.routes.roi_route import router as roi_router
+from app.routes.analysis_route import router as analysis_router
+from app.services.camera_live_stream import LiveStreamService
+from app.services.model_registry import ModelRegistry
+from app.services.notification_service import NotificationService
+from app.repositories.write_behind import WriteBehindQueue
+from app.services.stats_history import StatsHistory
+from app.core.config import MODEL_WARMUP, INFERENCE_PROCESSES
+from app.core.metrics import Metrics
 
 app = FastAPI()
 
@@ -33,6 +47,18 @@ app.include_router(camera_router)  # WebSocket for camera
 app.include_router(notify_router)  # WebSocket for notifications
 app.include_router(delete_images_router)  # Delete images routes
 app.include_router(delete_notifications_router)  # Delete notifications routes
+app.include_router(models_router)  # Model registry / hot-swap routes
+app.include_router(jobs_router)  # Background job progress
+app.include_router(notifications_router)  # Notification history (paginated)
+app.include_router(images_router)  # Image gallery (paginated)
+app.include_router(history_router)  # Density history (local rollups)
+app.include_router(roi_router)  # Per-camera ROI polygons
+app.include_router(analysis_router)  # Offline batch analysis jobs
+
+# Prometheus scrape target: stage latencies, websocket clients, alert cooldowns, Supabase calls
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return Metrics.render()
 
 # Get local IP function
 def get_local_ip():
@@ -71,7 +97,24 @@ async def startup_event():
     print(f"\n{'='*50}")
     print(f"🚀 Server starting on {local_ip}:8000")
     print(f"{'='*50}\n")
-    
+
+    # Load models in the background so the first frame does not pay for it
+    # (inference processes load their own copy of the live model)
+    if MODEL_WARMUP and not INFERENCE_PROCESSES:
+        ModelRegistry.warm_up("live")
+
+    # Start the shared camera pipelines (one capture thread per camera, batched inference)
+    LiveStreamService.manager.start()
+
+    # One density monitor per camera, reading the live pipeline's results
+    NotificationService.start_monitors()
+
+    # Batched Supabase inserts (also syncs rows buffered while offline)
+    WriteBehindQueue.start()
+
+    # Density history rollups (local SQLite, flushed periodically)
+    StatsHistory.start()
+
     # Register mDNS service
     try:
         zeroconf = Zeroconf()
@@ -103,7 +146,12 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     global zeroconf, service_info
-    
+
+    await NotificationService.stop_monitors()
+    await LiveStreamService.manager.stop()
+    await WriteBehindQueue.stop()
+    await StatsHistory.stop()
+
     if zeroconf and service_info:
         zeroconf.unregister_service(service_info)
         zeroconf.close()
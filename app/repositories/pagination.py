@@ -0,0 +1,51 @@
+from app.core.supabase_client import supabase
+from app.core.read_cache import ReadCache
+from app.core.config import READ_CACHE_TTL
+
+def fetch_page(table, columns, limit, cursor=None, since=None, until=None):
+    """
+    Keyset (cursor) page of a table, newest first.
+    cursor is the last id of the previous page; since / until filter on created_at.
+    Returns {"items": [...], "next_cursor": id or None}. Results are cached for
+    READ_CACHE_TTL seconds and invalidated by the table's writers.
+    """
+    key = (tuple(columns), limit, cursor, since, until)
+    cached = ReadCache.get(table, key)
+    if cached is not None:
+        return cached
+
+    # Always select id - it is the cursor
+    select = ",".join(dict.fromkeys(["id", *columns]))
+    query = supabase.table(table).select(select).order("id", desc=True).limit(limit + 1)
+    if cursor is not None:
+        query = query.lt("id", cursor)
+    if since is not None:
+        query = query.gte("created_at", since)
+    if until is not None:
+        query = query.lt("created_at", until)
+
+    rows = query.execute().data
+    has_more = len(rows) > limit
+    items = rows[:limit]
+
+    page = {
+        "items": items,
+        "next_cursor": items[-1]["id"] if has_more else None
+    }
+    ReadCache.put(table, key, page, READ_CACHE_TTL)
+    return page
+
+def fetch_after(table, columns, after=None, limit=1000):
+    """
+    Up to limit rows with id > after, oldest first (uncached).
+    Walks a whole table in pages that stay under PostgREST's max-rows cap.
+    """
+    select = ",".join(dict.fromkeys(["id", *columns]))
+    query = supabase.table(table).select(select).order("id").limit(limit)
+    if after is not None:
+        query = query.gt("id", after)
+    return query.execute().data
+
+def count_rows(table):
+    """Exact row count of a table"""
+    return supabase.table(table).select("id", count="exact").limit(1).execute().count or 0
@@ -1,6 +1,12 @@
 from app.core.supabase_client import supabase
+from app.repositories.write_behind import WriteBehindQueue
+from app.repositories.pagination import fetch_page, fetch_after, count_rows
+from app.core.read_cache import ReadCache
 
 class PreviousNotificationDAO:
+    TABLE = "previous_notifications"
+    COLUMNS = ("id", "message", "created_at")  # columns the listing API may project
+    
     @staticmethod
     def save(message: str):
         try:
@@ -8,11 +14,20 @@ class PreviousNotificationDAO:
                 "message": message
             }).execute()
             print(f"✅ Notification saved to DB: {message}")
+            ReadCache.invalidate(PreviousNotificationDAO.TABLE)
             return response
         except Exception as e:
             print(f"❌ Failed to save notification: {e}")
             raise
     
+    @staticmethod
+    def save_later(message: str):
+        """
+        Queue a notification for a batched insert (write-behind).
+        Returns immediately; the row is kept locally until Supabase accepts it.
+        """
+        WriteBehindQueue.enqueue("previous_notifications", {"message": message})
+    
     @staticmethod
     def get_all():
         """
@@ -25,6 +40,39 @@ class PreviousNotificationDAO:
             print(f"❌ Failed to retrieve notifications: {e}")
             raise
     
+    @staticmethod
+    def get_batch(after=None, limit=1000):
+        """
+        Retrieve up to limit rows with id > after, in id order (bulk deletes page with this).
+        """
+        try:
+            return fetch_after("previous_notifications", (), after, limit)
+        except Exception as e:
+            print(f"❌ Failed to retrieve notifications batch: {e}")
+            raise
+    
+    @staticmethod
+    def count():
+        """
+        Number of rows in the 'previous_notifications' table.
+        """
+        try:
+            return count_rows("previous_notifications")
+        except Exception as e:
+            print(f"❌ Failed to count notifications: {e}")
+            raise
+    
+    @staticmethod
+    def get_page(columns=COLUMNS, limit=50, cursor=None, since=None, until=None):
+        """
+        Retrieve one page of notifications, newest first (keyset pagination on id).
+        """
+        try:
+            return fetch_page("previous_notifications", columns, limit, cursor, since, until)
+        except Exception as e:
+            print(f"❌ Failed to retrieve notifications page: {e}")
+            raise
+    
     @staticmethod
     def delete_all():
         """
@@ -33,7 +81,21 @@ class PreviousNotificationDAO:
         try:
             response = supabase.table("previous_notifications").delete().neq("id", 0).execute()
             print(f"✅ All previous notifications deleted from DB")
+            ReadCache.invalidate(PreviousNotificationDAO.TABLE)
             return response
         except Exception as e:
             print(f"❌ Failed to delete all notifications: {e}")
+            raise
+    
+    @staticmethod
+    def delete_by_ids(ids):
+        """
+        Delete a batch of records from the 'previous_notifications' table by id.
+        """
+        try:
+            response = supabase.table("previous_notifications").delete().in_("id", ids).execute()
+            ReadCache.invalidate(PreviousNotificationDAO.TABLE)
+            return response
+        except Exception as e:
+            print(f"❌ Failed to delete notification batch: {e}")
             raise
\ No newline at end of file
@@ -1,6 +1,12 @@
 from app.core.supabase_client import supabase
+from app.repositories.write_behind import WriteBehindQueue
+from app.repositories.pagination import fetch_page, fetch_after, count_rows
+from app.core.read_cache import ReadCache
 
 class SavedImagesDAO:
+    TABLE = "saved_images"
+    COLUMNS = ("id", "image_metadata", "created_at")  # columns the listing API may project
+    
     @staticmethod
     def save(image_url: str):
         """
@@ -10,11 +16,20 @@ class SavedImagesDAO:
             data = {"image_metadata": image_url}
             response = supabase.table("saved_images").insert(data).execute()
             print(f"✅ Image saved to DB: {image_url}")
+            ReadCache.invalidate(SavedImagesDAO.TABLE)
             return response
         except Exception as e:
             print(f"❌ Failed to save image: {e}")
             raise
     
+    @staticmethod
+    def save_later(image_url: str):
+        """
+        Queue an image URL for a batched insert (write-behind).
+        Returns immediately; the row is kept locally until Supabase accepts it.
+        """
+        WriteBehindQueue.enqueue("saved_images", {"image_metadata": image_url})
+    
     @staticmethod
     def get_all():
         """
@@ -27,6 +42,39 @@ class SavedImagesDAO:
             print(f"❌ Failed to retrieve images: {e}")
             raise
     
+    @staticmethod
+    def get_batch(after=None, limit=1000):
+        """
+        Retrieve up to limit rows with id > after, in id order (bulk deletes page with this).
+        """
+        try:
+            return fetch_after("saved_images", ("image_metadata",), after, limit)
+        except Exception as e:
+            print(f"❌ Failed to retrieve images batch: {e}")
+            raise
+    
+    @staticmethod
+    def count():
+        """
+        Number of rows in the 'saved_images' table.
+        """
+        try:
+            return count_rows("saved_images")
+        except Exception as e:
+            print(f"❌ Failed to count images: {e}")
+            raise
+    
+    @staticmethod
+    def get_page(columns=COLUMNS, limit=50, cursor=None, since=None, until=None):
+        """
+        Retrieve one page of images, newest first (keyset pagination on id).
+        """
+        try:
+            return fetch_page("saved_images", columns, limit, cursor, since, until)
+        except Exception as e:
+            print(f"❌ Failed to retrieve images page: {e}")
+            raise
+    
     @staticmethod
     def delete_all():
         """
@@ -35,7 +83,21 @@ class SavedImagesDAO:
         try:
             response = supabase.table("saved_images").delete().neq("id", 0).execute()
             print(f"✅ All saved images deleted from DB")
+            ReadCache.invalidate(SavedImagesDAO.TABLE)
             return response
         except Exception as e:
             print(f"❌ Failed to delete all images: {e}")
+            raise
+    
+    @staticmethod
+    def delete_by_ids(ids):
+        """
+        Delete a batch of records from the 'saved_images' table by id.
+        """
+        try:
+            response = supabase.table("saved_images").delete().in_("id", ids).execute()
+            ReadCache.invalidate(SavedImagesDAO.TABLE)
+            return response
+        except Exception as e:
+            print(f"❌ Failed to delete image batch: {e}")
             raise
\ No newline at end of file
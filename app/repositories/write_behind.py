@@ -0,0 +1,149 @@
+import asyncio
+from app.core.supabase_client import supabase, run_supabase
+from app.core.offline_buffer import OfflineBuffer
+from app.core.read_cache import ReadCache
+from app.core.metrics import Metrics
+from app.core.config import OUTBOX_PATH, WRITE_BEHIND_INTERVAL, WRITE_BEHIND_BATCH_SIZE
+
+class WriteBehindQueue:
+    """
+    Buffered Supabase inserts.
+    Rows are stored in the local SQLite outbox first, then a background task
+    flushes them as one batched insert per table. While the uplink is down the
+    rows stay in the outbox and are retried with backoff. When Supabase rejects
+    a batch outright (bad payload, schema mismatch), its rows are retried one
+    by one and the rejected ones go to the outbox's dead_letter table, so the
+    rest keeps draining.
+    """
+
+    buffer = OfflineBuffer(OUTBOX_PATH)
+    MAX_BACKOFF = 60  # seconds
+
+    _task = None
+    _loop = None
+    _wakeup = None
+
+    @staticmethod
+    def enqueue(table: str, row: dict):
+        """Queue a row for insertion (safe to call from any thread)"""
+        WriteBehindQueue.buffer.add(table, row)
+
+        loop = WriteBehindQueue._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(WriteBehindQueue._wakeup.set)
+
+    @staticmethod
+    def pending() -> int:
+        return WriteBehindQueue.buffer.count()
+
+    @staticmethod
+    def dead_letters() -> int:
+        return WriteBehindQueue.buffer.dead_count()
+
+    @staticmethod
+    def _is_permanent(error) -> bool:
+        """
+        Whether Supabase rejected the rows themselves (retrying cannot help).
+        PostgREST reports the Postgres SQLSTATE / PGRST code: data (22), integrity
+        (23) and schema (42) errors and PGRST1xx / PGRST2xx request errors are
+        permanent; network failures, 5xx and connection errors are not.
+        """
+        code = str(getattr(error, "code", None) or "")
+        return code.startswith(("22", "23", "42", "PGRST1", "PGRST2"))
+
+    @staticmethod
+    def _insert_each(table, items) -> int:
+        """Insert rows one by one after a rejected batch, burying the ones rejected for good"""
+        written = 0
+        for row_id, row in items:
+            try:
+                supabase.table(table).insert(row).execute()
+            except Exception as e:
+                if not WriteBehindQueue._is_permanent(e):
+                    raise
+                WriteBehindQueue.buffer.bury(row_id, e)
+                Metrics.inc("worm_outbox_dead_letters_total", table=table)
+                print(f"☠️ Row {row_id} rejected by {table}, moved to dead_letter: {e}")
+                continue
+            WriteBehindQueue.buffer.delete([row_id])
+            written += 1
+        return written
+
+    @staticmethod
+    def flush_once() -> int:
+        """Insert up to one batch of pending rows. Returns how many were taken off the outbox."""
+        pending = WriteBehindQueue.buffer.fetch(WRITE_BEHIND_BATCH_SIZE)
+
+        by_table = {}
+        for row_id, table, row in pending:
+            by_table.setdefault(table, []).append((row_id, row))
+
+        written = 0
+        for table, items in by_table.items():
+            try:
+                supabase.table(table).insert([row for _, row in items]).execute()
+            except Exception as e:
+                if not WriteBehindQueue._is_permanent(e):
+                    raise  # transient - keep the batch and back off
+                print(f"⚠️ Batch rejected by {table}, retrying its {len(items)} row(s) one by one: {e}")
+                flushed = WriteBehindQueue._insert_each(table, items)
+                ReadCache.invalidate(table)
+                written += len(items)
+                print(f"✅ Flushed {flushed} of {len(items)} row(s) to {table}")
+                continue
+
+            WriteBehindQueue.buffer.delete([row_id for row_id, _ in items])
+            ReadCache.invalidate(table)
+            written += len(items)
+            print(f"✅ Flushed {len(items)} row(s) to {table}")
+        return written
+
+    @staticmethod
+    def start():
+        """Start the flush task on the running event loop"""
+        if WriteBehindQueue._task is None:
+            WriteBehindQueue._loop = asyncio.get_running_loop()
+            WriteBehindQueue._wakeup = asyncio.Event()
+            WriteBehindQueue._task = asyncio.create_task(WriteBehindQueue._run())
+
+    @staticmethod
+    async def stop():
+        """Stop the flush task after one last best-effort flush"""
+        if WriteBehindQueue._task is None:
+            return
+        WriteBehindQueue._task.cancel()
+        try:
+            await WriteBehindQueue._task
+        except asyncio.CancelledError:
+            pass
+        WriteBehindQueue._task = None
+        WriteBehindQueue._loop = None
+
+        try:
+            await run_supabase(WriteBehindQueue.flush_once)
+        except Exception as e:
+            print(f"⚠️ {WriteBehindQueue.pending()} row(s) left in outbox, will sync on next start: {e}")
+
+    @staticmethod
+    async def _run():
+        backoff = WRITE_BEHIND_INTERVAL
+
+        while True:
+            try:
+                await asyncio.wait_for(WriteBehindQueue._wakeup.wait(), timeout=WRITE_BEHIND_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            WriteBehindQueue._wakeup.clear()
+
+            try:
+                written = await run_supabase(WriteBehindQueue.flush_once)
+                backoff = WRITE_BEHIND_INTERVAL
+                if written >= WRITE_BEHIND_BATCH_SIZE:
+                    # More rows waiting - flush the next batch right away
+                    WriteBehindQueue._wakeup.set()
+
+            except Exception as e:
+                print(f"⚠️ Supabase unreachable, {WriteBehindQueue.pending()} row(s) buffered "
+                      f"(retry in {backoff:.0f}s): {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, WriteBehindQueue.MAX_BACKOFF)
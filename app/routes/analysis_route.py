@@ -0,0 +1,34 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from app.services.analysis_service import AnalysisService
+
+router = APIRouter(prefix="/api/analysis", tags=["Analysis"])
+
+
+class AnalysisRequest(BaseModel):
+    inputs: List[str]  # files / folders relative to ANALYSIS_INPUT_DIR
+    output: str  # file name in ANALYSIS_OUTPUT_DIR, .csv or .parquet
+    format: Optional[str] = None
+    frame_step: int = 1  # analyze every Nth video frame
+    resume: bool = True
+
+
+@router.post("")
+async def start_analysis(request: AnalysisRequest):
+    """
+    Count larvae in recorded images / videos as a background job, writing
+    per-frame counts and densities to the output. Returns the job id right
+    away; poll /api/jobs/{job_id} for progress.
+    """
+    try:
+        job = AnalysisService.start(
+            request.inputs, request.output, request.format, request.frame_step, request.resume
+        )
+        return {"success": True, "job_id": job["id"], "status_url": f"/api/jobs/{job['id']}"}
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
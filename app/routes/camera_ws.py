@@ -2,15 +2,65 @@
 
 from fastapi import APIRouter, WebSocket
 from app.services.camera_live_stream import LiveStreamService
+from app.core.metrics import Metrics
+from app.core.config import RENDITIONS, DEFAULT_RENDITION
 
 router = APIRouter()
 
 @router.websocket("/ws/camera")
-async def camera_ws(websocket: WebSocket):
+@router.websocket("/ws/camera/{camera_id}")
+async def camera_ws(websocket: WebSocket, camera_id: str = None, mode: str = "text",
+                    rendition: str = DEFAULT_RENDITION):
+    # ?mode=binary -> header + raw JPEG with stats (new clients)
+    # ?mode=overlay -> header + mask polygons + clean JPEG, client draws the overlay
+    # ?mode=text (default) -> base64 JPEG strings (older app builds)
+    # ?rendition=low|medium|high -> size / quality, switchable later with {"rendition": ...}
+    if mode not in ("text", "binary", "overlay"):
+        mode = "text"
+    if rendition not in RENDITIONS:
+        rendition = DEFAULT_RENDITION
+    if LiveStreamService.get_pipeline(camera_id) is None:
+        await websocket.close(code=1008)  # Unknown camera
+        return
     await websocket.accept()
-    await LiveStreamService.start_video_stream(websocket)
+    Metrics.inc("worm_ws_connections", endpoint="/ws/camera")
+    try:
+        await LiveStreamService.start_video_stream(websocket, camera_id, mode, rendition)
+    finally:
+        Metrics.inc("worm_ws_connections", -1, endpoint="/ws/camera")
+
+@router.get("/api/cameras")
+async def list_cameras():
+    """Configured cameras with their ROI / threshold settings"""
+    return [pipeline.camera for pipeline in LiveStreamService.manager.pipelines.values()]
+
+@router.get("/api/camera/renditions")
+async def list_renditions():
+    """Video renditions a viewer can pick with ?rendition="""
+    return {
+        "default": DEFAULT_RENDITION,
+        "renditions": {
+            name: {"width": width, "height": height, "quality": quality}
+            for name, (width, height, quality) in RENDITIONS.items()
+        }
+    }
+
+@router.get("/api/camera/pipeline")
+async def camera_pipeline_status():
+    """Capture / processing counters per camera, including dropped frames"""
+    return LiveStreamService.manager.status()
 
 @router.websocket("/ws/camera-stats")  #Eto yung sa live stats Rai
-async def camera_stats_ws(websocket: WebSocket):
+@router.websocket("/ws/camera-stats/{camera_id}")
+async def camera_stats_ws(websocket: WebSocket, camera_id: str = None,
+                          max_rate: float = None, coalesce_ms: int = 0):
+    # Stats are pushed on change. Optional: ?max_rate=2 (updates/sec), ?coalesce_ms=250
+    if LiveStreamService.get_pipeline(camera_id) is None:
+        await websocket.close(code=1008)  # Unknown camera
+        return
     await websocket.accept()
-    await LiveStreamService.start_stats_stream(websocket)
\ No newline at end of file
+    Metrics.inc("worm_ws_connections", endpoint="/ws/camera-stats")
+    try:
+        await LiveStreamService.start_stats_stream(websocket, camera_id, max_rate, coalesce_ms)
+    finally:
+        Metrics.inc("worm_ws_connections", -1, endpoint="/ws/camera-stats")
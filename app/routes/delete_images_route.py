@@ -1,16 +1,18 @@
 from fastapi import APIRouter, HTTPException
 from app.services.delete_images_service import DeleteImagesService
+from app.core.supabase_client import run_supabase
 
 router = APIRouter(prefix="/api/images", tags=["Images"])
 
 @router.delete("/delete-all")
 async def delete_all_images():
     """
-    Delete all saved images from storage and database.
+    Delete all saved images from storage and database as a background job.
+    Returns the job id right away; poll /api/jobs/{job_id} for progress.
     """
     try:
-        result = DeleteImagesService.delete_all_saved_images()
-        return result
+        job = DeleteImagesService.start_delete_all()
+        return {"success": True, "job_id": job["id"], "status_url": f"/api/jobs/{job['id']}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -20,7 +22,7 @@ async def delete_image(image_url: str):
     Delete a specific image by URL.
     """
     try:
-        result = DeleteImagesService.delete_image_by_url(image_url)
+        result = await run_supabase(DeleteImagesService.delete_image_by_url, image_url)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
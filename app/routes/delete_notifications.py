@@ -1,16 +1,18 @@
 from fastapi import APIRouter, HTTPException
 from app.services.delete_notifications_service import DeleteNotificationsService
+from app.core.supabase_client import run_supabase
 
 router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
 
 @router.delete("/delete-all")
 async def delete_all_notifications():
     """
-    Delete all previous notifications from the database.
+    Delete all previous notifications from the database as a background job.
+    Returns the job id right away; poll /api/jobs/{job_id} for progress.
     """
     try:
-        result = DeleteNotificationsService.delete_all_notifications()
-        return result
+        job = DeleteNotificationsService.start_delete_all()
+        return {"success": True, "job_id": job["id"], "status_url": f"/api/jobs/{job['id']}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -20,7 +22,7 @@ async def delete_notification(notification_id: int):
     Delete a specific notification by ID.
     """
     try:
-        result = DeleteNotificationsService.delete_notification_by_id(notification_id)
+        result = await run_supabase(DeleteNotificationsService.delete_notification_by_id, notification_id)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,48 @@
+import asyncio
+import time
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from app.core.stats_store import StatsStore
+from app.services.camera_live_stream import LiveStreamService
+from app.services.stats_history import StatsHistory
+
+router = APIRouter(prefix="/api/history", tags=["History"])
+
+@router.get("")
+async def get_history(
+    camera_id: str = None,
+    resolution: str = "1m",
+    since: datetime = None,
+    until: datetime = None,
+    limit: int = Query(1000, ge=1, le=5000)
+):
+    """
+    Density trend for one camera, read from the local rollups.
+    resolution is 1s, 1m or 1h; each point has min / mean / max of the larvae
+    count and density (per cm²). Defaults to the last 24 hours.
+    """
+    if resolution not in StatsStore.RESOLUTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown resolution, use one of: {', '.join(StatsStore.RESOLUTIONS)}"
+        )
+
+    pipeline = LiveStreamService.get_pipeline(camera_id)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="Unknown camera")
+
+    until_ts = until.timestamp() if until else time.time()
+    since_ts = since.timestamp() if since else until_ts - 24 * 3600
+
+    try:
+        points = await asyncio.get_running_loop().run_in_executor(
+            None, StatsHistory.query, pipeline.camera_id, resolution, since_ts, until_ts, limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "camera_id": pipeline.camera_id,
+        "resolution": resolution,
+        "points": points
+    }
@@ -0,0 +1,38 @@
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from app.repositories.saved_images_dao import SavedImagesDAO
+from app.core.supabase_client import run_supabase
+
+router = APIRouter(prefix="/api/images", tags=["Images"])
+
+@router.get("")
+async def list_images(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: int = None,
+    fields: str = None,
+    since: datetime = None,
+    until: datetime = None
+):
+    """
+    Page through the image gallery, newest first.
+    Pass the returned next_cursor as ?cursor= to get the next page.
+    fields selects columns (comma separated), since / until filter on created_at.
+    """
+    columns = SavedImagesDAO.COLUMNS
+    if fields:
+        columns = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = set(columns) - set(SavedImagesDAO.COLUMNS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    try:
+        return await run_supabase(
+            SavedImagesDAO.get_page,
+            columns,
+            limit,
+            cursor,
+            since.isoformat() if since else None,
+            until.isoformat() if until else None
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
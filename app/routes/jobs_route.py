@@ -0,0 +1,14 @@
+from fastapi import APIRouter, HTTPException
+from app.services.job_manager import JobManager
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status and progress of a background job (bulk deletes, batch analysis).
+    """
+    job = JobManager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,32 @@
+import asyncio
+from pathlib import Path
+from fastapi import APIRouter, HTTPException
+from app.services.model_registry import ModelRegistry
+
+router = APIRouter(prefix="/api/models", tags=["Models"])
+
+@router.get("")
+async def list_models():
+    """
+    List model roles, their weights file and whether they are loaded.
+    """
+    return ModelRegistry.status()
+
+@router.post("/{role}/swap")
+async def swap_model(role: str, weights: str):
+    """
+    Hot-swap the weights used by a model role (e.g. ?weights=segmentv4.pt).
+    Only files inside the trained models folder are accepted.
+    """
+    if Path(weights).name != weights:
+        raise HTTPException(status_code=400, detail="weights must be a file name")
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, ModelRegistry.swap, role, weights)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
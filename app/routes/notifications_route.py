@@ -0,0 +1,38 @@
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from app.repositories.previous_notification_dao import PreviousNotificationDAO
+from app.core.supabase_client import run_supabase
+
+router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
+
+@router.get("")
+async def list_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: int = None,
+    fields: str = None,
+    since: datetime = None,
+    until: datetime = None
+):
+    """
+    Page through the notification history, newest first.
+    Pass the returned next_cursor as ?cursor= to get the next page.
+    fields selects columns (comma separated), since / until filter on created_at.
+    """
+    columns = PreviousNotificationDAO.COLUMNS
+    if fields:
+        columns = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = set(columns) - set(PreviousNotificationDAO.COLUMNS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    try:
+        return await run_supabase(
+            PreviousNotificationDAO.get_page,
+            columns,
+            limit,
+            cursor,
+            since.isoformat() if since else None,
+            until.isoformat() if until else None
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from app.services.notification_service import NotificationService
+from app.core.metrics import Metrics
 
 router = APIRouter()
 
@@ -8,10 +9,13 @@ async def notify_ws(websocket: WebSocket):
     await websocket.accept()
     client_host = websocket.client.host if websocket.client else "unknown"
     print(f"✅ Notification client connected from {client_host}")
+    Metrics.inc("worm_ws_connections", endpoint="/ws/notify")
 
     try:
-        await NotificationService.start_monitoring(websocket)  # ← CHANGED HERE
+        await NotificationService.start_monitoring(websocket)  # Subscribes to the shared monitors
     except WebSocketDisconnect:
         print(f"🔴 Notification client disconnected: {client_host}")
     except Exception as e:
-        print(f"❌ Notification error for {client_host}: {e}")
\ No newline at end of file
+        print(f"❌ Notification error for {client_host}: {e}")
+    finally:
+        Metrics.inc("worm_ws_connections", -1, endpoint="/ws/notify")
\ No newline at end of file
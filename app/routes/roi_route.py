@@ -0,0 +1,72 @@
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from app.core.camera_config import CameraConfig
+from app.services.camera_live_stream import LiveStreamService
+
+router = APIRouter(prefix="/api/cameras", tags=["Cameras"])
+
+
+class RoiUpdate(BaseModel):
+    polygon: Optional[List[List[float]]] = None  # [[x, y], ...] in frame pixels, None = whole frame
+    area_cm2: float  # physical area inside the polygon
+
+
+def _get_pipeline(camera_id):
+    pipeline = LiveStreamService.get_pipeline(camera_id)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="Unknown camera")
+    return pipeline
+
+
+def _roi(pipeline):
+    return {
+        "camera_id": pipeline.camera_id,
+        "polygon": pipeline.roi.outline() if pipeline.roi else None,
+        "area_cm2": pipeline.camera["roi_area_cm2"]
+    }
+
+
+def _validate(pipeline, polygon, area_cm2):
+    try:
+        CameraConfig.validate_roi(polygon, area_cm2, pipeline.frame_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _apply(pipeline, polygon, area_cm2):
+    """Switch the live pipeline to a validated ROI and persist all cameras to the cameras file"""
+    pipeline.set_roi(polygon, area_cm2)
+    cameras = [p.camera for p in LiveStreamService.manager.pipelines.values()]
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, CameraConfig.save, cameras)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"ROI applied but not saved: {e}")
+
+    print(f"🔲 ROI of camera {pipeline.camera_id} updated ({area_cm2} cm²)")
+    return _roi(pipeline)
+
+
+@router.get("/{camera_id}/roi")
+async def get_roi(camera_id: str):
+    """Current ROI polygon and area of a camera"""
+    return _roi(_get_pipeline(camera_id))
+
+
+@router.put("/{camera_id}/roi")
+async def update_roi(camera_id: str, update: RoiUpdate):
+    """Set a camera's ROI; inference is cropped to it from the next frame"""
+    pipeline = _get_pipeline(camera_id)
+    # Validate before unpacking the points (a malformed point is a 400, not a 500)
+    _validate(pipeline, update.polygon, update.area_cm2)
+    polygon = [[int(round(x)), int(round(y))] for x, y in update.polygon] if update.polygon else None
+    return await _apply(pipeline, polygon, update.area_cm2)
+
+
+@router.delete("/{camera_id}/roi")
+async def delete_roi(camera_id: str):
+    """Drop a camera's ROI polygon (whole frame again); the area is kept"""
+    pipeline = _get_pipeline(camera_id)
+    _validate(pipeline, None, pipeline.camera["roi_area_cm2"])
+    return await _apply(pipeline, None, pipeline.camera["roi_area_cm2"])
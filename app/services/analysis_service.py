@@ -0,0 +1,59 @@
+import asyncio
+from pathlib import Path
+from app.services.batch_analyzer import BatchAnalyzer
+from app.services.job_manager import JobManager
+from app.core.config import ANALYSIS_INPUT_DIR, ANALYSIS_OUTPUT_DIR, ANALYSIS_WORKERS
+
+
+class AnalysisService:
+    # Outputs a job is currently writing (two runs must not share a checkpoint)
+    running = set()
+
+    @staticmethod
+    def _inside(root: Path, relative: str) -> Path:
+        """Resolve relative under root, refusing paths that escape it"""
+        root = root.resolve()
+        path = (root / relative).resolve()
+        if path != root and root not in path.parents:
+            raise ValueError(f"{relative} is outside {root}")
+        return path
+
+    @staticmethod
+    def start(inputs, output, fmt=None, frame_step=1, resume=True):
+        """
+        Start a batch analysis of recordings under ANALYSIS_INPUT_DIR in the background.
+        output is a file name in ANALYSIS_OUTPUT_DIR (.csv or .parquet); an unfinished
+        run into the same output is resumed. Returns the job record.
+        """
+        sources = [AnalysisService._inside(ANALYSIS_INPUT_DIR, entry) for entry in inputs]
+        for source in sources:
+            if not source.exists():
+                raise FileNotFoundError(f"Not found: {source.relative_to(ANALYSIS_INPUT_DIR.resolve())}")
+        target = AnalysisService._inside(ANALYSIS_OUTPUT_DIR, output)
+        if fmt not in (None, "csv", "parquet") or frame_step < 1:
+            raise ValueError("format must be csv or parquet and frame_step >= 1")
+        if target in AnalysisService.running:
+            raise RuntimeError(f"{output} is already being analyzed")
+
+        async def work(job):
+            loop = asyncio.get_running_loop()
+
+            def progress(done, total):
+                loop.call_soon_threadsafe(JobManager.set_progress, job, done, total)
+
+            def run():
+                # Always on inference processes: an in-process model could be the
+                # live pipeline's instance, and ultralytics models are not thread-safe
+                analyzer = BatchAnalyzer(
+                    sources, target, fmt=fmt, frame_step=frame_step, workers=max(1, ANALYSIS_WORKERS)
+                )
+                return analyzer.run(resume=resume, progress=progress)
+
+            try:
+                # Decoding, inference processes and file writes all stay off the event loop
+                return await loop.run_in_executor(None, run)
+            finally:
+                AnalysisService.running.discard(target)
+
+        AnalysisService.running.add(target)
+        return JobManager.submit("batch_analysis", work)
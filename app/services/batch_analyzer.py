@@ -0,0 +1,409 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from queue import Queue, Full
+import cv2
+from app.services.inference_pool import InferenceProcess
+from app.services.larva_metrics import LarvaMetrics
+from app.services.model_registry import ModelRegistry
+from app.services.tiled_inference import TiledInference
+from app.core.config import (
+    ANALYSIS_BATCH_SIZE, ANALYSIS_WORKERS, ANALYSIS_PREFETCH, ANALYSIS_CHECKPOINT_ROWS,
+    INFERENCE_MAX_FRAME, TILE_SIZE
+)
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+VIDEO_EXTENSIONS = {".mov", ".mp4", ".avi", ".mkv", ".m4v", ".webm"}
+
+# One row per analyzed frame (time_s is the position in the video, empty for images)
+COLUMNS = (
+    "source", "frame", "time_s", "larvae_count", "mask_count", "area_est_count",
+    "density_cm2", "density_m2", "is_high_density"
+)
+
+
+class CsvSink:
+    """Rows appended to one CSV file; the checkpoint position is its size in bytes"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def reset(self):
+        if self.path.exists():
+            self.path.unlink()
+
+    def truncate(self, position):
+        """Drop rows written after the last checkpoint"""
+        if self.path.exists():
+            with open(self.path, "r+b") as f:
+                f.truncate(position)
+
+    def write(self, rows) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = not self.path.exists() or self.path.stat().st_size == 0
+        with open(self.path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            if header:
+                writer.writeheader()
+            writer.writerows(rows)
+        return self.path.stat().st_size
+
+
+class ParquetSink:
+    """Rows as a Parquet dataset directory, one part file per checkpoint; the position is the part count"""
+
+    def __init__(self, path):
+        if pyarrow is None:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow), or write a .csv")
+        self.path = Path(path)
+        self.schema = pyarrow.schema([
+            ("source", pyarrow.string()),
+            ("frame", pyarrow.int64()),
+            ("time_s", pyarrow.float64()),
+            ("larvae_count", pyarrow.int64()),
+            ("mask_count", pyarrow.int64()),
+            ("area_est_count", pyarrow.float64()),
+            ("density_cm2", pyarrow.float64()),
+            ("density_m2", pyarrow.float64()),
+            ("is_high_density", pyarrow.bool_())
+        ])
+        self._parts = 0
+
+    def reset(self):
+        self.truncate(0)
+
+    def truncate(self, position):
+        for part in self.path.glob("part-*.parquet"):
+            if int(part.stem.split("-")[1]) >= position:
+                part.unlink()
+        self._parts = position
+
+    def write(self, rows) -> int:
+        self.path.mkdir(parents=True, exist_ok=True)
+        table = pyarrow.Table.from_pylist(rows, schema=self.schema)
+        pq.write_table(table, self.path / f"part-{self._parts:05d}.parquet")
+        self._parts += 1
+        return self._parts
+
+
+class BatchAnalyzer:
+    """
+    Headless larva counting over folders of images and recorded videos.
+
+    A decoder thread reads frames ahead of inference (ANALYSIS_PREFETCH batches)
+    while ANALYSIS_WORKERS threads each drive their own InferenceProcess, so
+    decoding, inference and writing overlap. Results are written in input
+    order to CSV (or a Parquet dataset directory) and every flush also saves
+    a checkpoint next to the output; rerunning with the same output resumes
+    after the last checkpoint instead of starting over.
+    """
+
+    def __init__(self, inputs, output, fmt=None, role="live",
+                 batch_size=ANALYSIS_BATCH_SIZE, workers=ANALYSIS_WORKERS, frame_step=1,
+                 roi_area_cm2=LarvaMetrics.ROI_AREA_CM2,
+                 avg_worm_area=LarvaMetrics.AVG_WORM_AREA,
+                 density_threshold=LarvaMetrics.DENSITY_THRESHOLD):
+        if batch_size < 1 or frame_step < 1 or workers < 0:
+            raise ValueError("batch_size and frame_step must be >= 1, workers >= 0")
+
+        self.sources = BatchAnalyzer.find_sources(inputs)
+        self.output = Path(output)
+        fmt = fmt or ("parquet" if self.output.suffix == ".parquet" else "csv")
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Unknown output format: {fmt}")
+        self.format = fmt
+        self.sink = ParquetSink(self.output) if fmt == "parquet" else CsvSink(self.output)
+        self.checkpoint_path = Path(f"{self.output}.checkpoint.json")
+
+        self.role = role
+        self.batch_size = batch_size
+        self.workers = workers
+        self.frame_step = frame_step
+        self.metrics = {
+            "roi_area_cm2": roi_area_cm2,
+            "avg_worm_area": avg_worm_area,
+            "density_threshold": density_threshold
+        }
+
+        self.frames_done = 0
+        self.frames_total = None
+        self._stop = threading.Event()
+        self._local = threading.local()
+        self._detectors = []
+        self._detectors_lock = threading.Lock()
+
+    @staticmethod
+    def find_sources(inputs):
+        """Image / video files among inputs (files or directories, searched recursively), in a stable order"""
+        extensions = IMAGE_EXTENSIONS | VIDEO_EXTENSIONS
+        sources = []
+        for entry in inputs:
+            path = Path(entry)
+            if path.is_dir():
+                sources.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in extensions))
+            elif path.is_file():
+                sources.append(path)
+            else:
+                raise FileNotFoundError(f"No such file or directory: {path}")
+        return [str(p.resolve()) for p in sources]
+
+    def run(self, resume=True, progress=None):
+        """
+        Analyze every source and return a summary.
+        progress(done, total) is called from this thread after each batch.
+        """
+        model = ModelRegistry.path(self.role).name
+        state = self._load_checkpoint() if resume else None
+        if state is None:
+            self.sink.reset()
+            state = {
+                "model": model,
+                "frame_step": self.frame_step,
+                "completed": [],
+                "partial": None,
+                "position": 0,
+                "rows": 0,
+                "finished": False
+            }
+        elif (state["model"], state["frame_step"]) != (model, self.frame_step):
+            raise ValueError(
+                f"{self.output.name} was started with {state['model']} every {state['frame_step']} "
+                f"frame(s); use a new output (or resume=False) for {model} every {self.frame_step}"
+            )
+        else:
+            self.sink.truncate(state["position"])
+            print(f"↩️ Resuming {self.output.name} after {state['rows']} frames")
+
+        resumed_from = state["rows"]
+        self.frames_done = resumed_from
+        self.frames_total = self.frames_done + sum(self._frame_count(s, state) for s in self.sources)
+        print(f"🎞️ Analyzing {len(self.sources)} source(s), ~{self.frames_total} frames -> {self.output} "
+              f"({model}, batch {self.batch_size}, {self.workers} inference process(es))")
+
+        start = time.perf_counter()
+        decoded = Queue(maxsize=ANALYSIS_PREFETCH)
+        decoder = threading.Thread(target=self._decode, args=(state, decoded), name="analysis-decoder", daemon=True)
+        decoder.start()
+
+        rows = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="analysis-worker") as pool:
+                # Batches in flight, oldest first, so rows are written in input order
+                pending = deque()
+                while True:
+                    batch = decoded.get()
+                    if isinstance(batch, Exception):
+                        raise batch
+                    if batch is None:
+                        break
+                    meta = [m for m, _ in batch]
+                    pending.append((meta, pool.submit(self._detect, [frame for _, frame in batch])))
+                    if len(pending) > max(1, self.workers):
+                        self._collect(pending.popleft(), rows, state, progress)
+
+                while pending:
+                    self._collect(pending.popleft(), rows, state, progress)
+            self._flush(rows, state, finished=True)
+        finally:
+            self._stop.set()
+            for detector in self._detectors:
+                detector.close()
+            self._detectors = []
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "output": str(self.output),
+            "format": self.format,
+            "model": model,
+            "sources": len(self.sources),
+            "frames": state["rows"],
+            "resumed_from": resumed_from,
+            "seconds": round(elapsed, 1)
+        }
+        print(f"✅ Analysis done: {state['rows']} frames in {elapsed:.0f}s -> {self.output}")
+        return summary
+
+    def _frame_count(self, source, state):
+        """Frames still to analyze in a source (estimate from the container for videos)"""
+        if source in state["completed"]:
+            return 0
+        partial = state["partial"] or {}
+        start = partial.get("next_frame", 0) if partial.get("source") == source else 0
+        if Path(source).suffix.lower() in IMAGE_EXTENSIONS:
+            return 1 if start == 0 else 0
+
+        cap = cv2.VideoCapture(source)
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        cap.release()
+        first = -(-start // self.frame_step) * self.frame_step  # first sampled frame >= start
+        return max(0, -(-(count - first) // self.frame_step))
+
+    def _decode(self, state, decoded):
+        """Decoder thread: read frames ahead of inference and queue them in batches"""
+        try:
+            partial = state["partial"] or {}
+            batch = []
+            for source in self.sources:
+                if source in state["completed"]:
+                    continue
+                start = partial.get("next_frame", 0) if partial.get("source") == source else 0
+                for index, time_s, frame in self._frames(source, start):
+                    batch.append(((source, index, time_s), frame))
+                    if len(batch) == self.batch_size:
+                        if not self._put(decoded, batch):
+                            return
+                        batch = []
+            if batch and not self._put(decoded, batch):
+                return
+            self._put(decoded, None)
+        except Exception as e:
+            self._put(decoded, e)
+
+    def _put(self, decoded, item) -> bool:
+        """Queue item, giving up once the run stopped (so the decoder never blocks forever)"""
+        while not self._stop.is_set():
+            try:
+                decoded.put(item, timeout=0.5)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _frames(self, source, start):
+        """Yield (frame index, seconds into the video or None, frame) of a source from frame start"""
+        if Path(source).suffix.lower() in IMAGE_EXTENSIONS:
+            if start > 0:
+                return
+            frame = cv2.imread(source)
+            if frame is None:
+                print(f"⚠️ Cannot read image {source}, skipping")
+                return
+            yield 0, None, self._fit(frame)
+            return
+
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            print(f"⚠️ Cannot open video {source}, skipping")
+            return
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0
+            index = 0
+            if start:
+                # Seek when the container supports it, otherwise skip frames below
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+                index = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+                if index != start:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    index = 0
+
+            while not self._stop.is_set():
+                if index < start or index % self.frame_step:
+                    # Skipped frames are only demuxed, not decoded
+                    if not cap.grab():
+                        break
+                else:
+                    ok, frame = cap.read()
+                    if not ok:
+                        break
+                    yield index, round(index / fps, 3) if fps else None, self._fit(frame)
+                index += 1
+        finally:
+            cap.release()
+
+    def _fit(self, frame):
+        """Downscale frames too large for an inference process ring slot (INFERENCE_MAX_FRAME)"""
+        max_pixels = INFERENCE_MAX_FRAME[0] * INFERENCE_MAX_FRAME[1]
+        height, width = frame.shape[:2]
+        if not self.workers or height * width <= max_pixels:
+            return frame
+        scale = (max_pixels / (height * width)) ** 0.5
+        return cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    def _detect(self, frames):
+        """Worker thread: one batched detection, on this thread's own inference process"""
+        if not self.workers:
+            model = ModelRegistry.get(self.role)
+            if TILE_SIZE:
+                return TiledInference.detect(model, frames)
+            return model(frames, imgsz=640, conf=0.4, verbose=False)
+
+        detector = getattr(self._local, "detector", None)
+        if detector is None:
+            detector = InferenceProcess(slots=self.batch_size, role=self.role)
+            self._local.detector = detector
+            with self._detectors_lock:
+                self._detectors.append(detector)
+        return detector.detect(frames)
+
+    def _collect(self, item, rows, state, progress):
+        """Turn a finished batch into rows (in input order), flushing every ANALYSIS_CHECKPOINT_ROWS"""
+        meta, future = item
+        for (source, index, time_s), results in zip(meta, future.result()):
+            stats = LarvaMetrics.compute(results, **self.metrics)
+            rows.append({
+                "source": source,
+                "frame": index,
+                "time_s": time_s,
+                "larvae_count": stats["larvae_count"],
+                "mask_count": stats["mask_count"],
+                "area_est_count": round(float(stats["area_est_count"]), 3),
+                "density_cm2": round(float(stats["density_cm2"]), 5),
+                "density_m2": round(float(stats["density_m2"]), 2),
+                "is_high_density": bool(stats["is_high_density"])
+            })
+        self.frames_done += len(meta)
+
+        if len(rows) >= ANALYSIS_CHECKPOINT_ROWS:
+            self._flush(rows, state)
+        if progress is not None:
+            progress(self.frames_done, self.frames_total)
+
+    def _flush(self, rows, state, finished=False):
+        """Write buffered rows, then record how far the output goes in the checkpoint"""
+        if ModelRegistry.path(self.role).name != state["model"]:
+            raise RuntimeError(
+                f"Model '{self.role}' was swapped during the run; rerun into a new output "
+                f"({self.output.name} stays resumable with {state['model']})"
+            )
+
+        if rows:
+            state["position"] = self.sink.write(rows)
+            state["rows"] += len(rows)
+            for row in rows:
+                partial = state["partial"]
+                if partial is not None and partial["source"] != row["source"]:
+                    # Sources are decoded in order: a new source means the previous one is done
+                    state["completed"].append(partial["source"])
+                state["partial"] = {"source": row["source"], "next_frame": row["frame"] + 1}
+            rows.clear()
+
+        if finished:
+            if state["partial"] is not None:
+                state["completed"].append(state["partial"]["source"])
+                state["partial"] = None
+            state["finished"] = True
+        self._save_checkpoint(state)
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return None
+        try:
+            return json.loads(self.checkpoint_path.read_text())
+        except Exception as e:
+            print(f"❌ Failed to read {self.checkpoint_path.name}: {e}")
+            raise
+
+    def _save_checkpoint(self, state):
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state))
+        tmp_path.replace(self.checkpoint_path)
@@ -1,142 +1,156 @@
-import cv2
 import asyncio
-import base64
+import cv2
 import json
-import numpy as np
-from concurrent.futures import ThreadPoolExecutor
-from ultralytics import YOLO
+import time
 from pathlib import Path
+from app.services.camera_pipeline import CameraManager, CameraPipeline
+from app.services.stage_timer import StageTimer
+from app.core.metrics import Metrics
+from app.core.camera_config import CameraConfig
+from app.core.config import TARGET_FPS, RENDITIONS, DEFAULT_RENDITION, CLIENT_STALL_TIMEOUT
 
 class LiveStreamService:
-    executor = ThreadPoolExecutor(max_workers=1)
+    # All cameras (from cameras.json) share one manager: capture thread per camera,
+    # one batched inference call per tick. Started in app startup.
+    manager = CameraManager(CameraConfig.load(), target_fps=TARGET_FPS)
     
-    # Shared state for stats
-    current_stats = {
-        "larvae_count": 0,
-        "density_cm2": 0,
-        "density_m2": 0,
-        "is_high_density": False,
-        "timestamp": ""
-    }
-    stats_lock = asyncio.Lock()
-    
-    # Load YOLO model once
+    # Model is shared through ModelRegistry (role "live")
     BASE_DIR = Path(__file__).resolve().parents[2]
-    MODEL_PATH = BASE_DIR / "app" / "yolo" / "models" / "trained" / "wormv11-seg-final.pt"
     VIDEO_PATH = BASE_DIR / "app" / "yolo" / "videos" / "worm-vid.MOV"
-    model = YOLO(str(MODEL_PATH))
     
-    # Constants
-    ROI_AREA_CM2 = 413
-    ROI_AREA_M2 = ROI_AREA_CM2 / 10000
-    AVG_WORM_AREA = 386
-    DENSITY_THRESHOLD = 1.25
+    @staticmethod
+    def get_pipeline(camera_id=None):
+        """Pipeline of a camera (default camera when None), or None if unknown"""
+        return LiveStreamService.manager.get(camera_id)
     
     @staticmethod
-    def capture_frame(cap):
-        """Run YOLO once, return clean video frame + update stats"""
-        ret, frame = cap.read()
-        
-        if not ret:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    def capture_frame(cap, camera_id=None, rendition=DEFAULT_RENDITION):
+        """
+        Read one frame from cap and process it (used outside the live pipeline).
+        Returns {rendition: EncodedFrame} like CameraPipeline.render, with at
+        least the requested (burned-in) rendition.
+        """
+        with StageTimer.measure("decode"):
             ret, frame = cap.read()
-            if not ret:
-                return None
         
-        # Run YOLO inference ONCE
-        results = LiveStreamService.model(frame, imgsz=640, conf=0.4, verbose=False)[0]
-        
-        # Calculate stats
-        mask_count = 0
-        total_mask_area = 0
-        
-        if results.masks is not None:
-            masks = results.masks.data.cpu().numpy()
-            
-            for mask in masks:
-                area = np.sum(mask)
-                if area > 50:
-                    mask_count += 1
-                    total_mask_area += area
-            
-            area_est_count = total_mask_area / LiveStreamService.AVG_WORM_AREA if LiveStreamService.AVG_WORM_AREA > 0 else 0
-            final_count = int(max(mask_count, area_est_count))
-            larvae_per_cm2 = final_count / LiveStreamService.ROI_AREA_CM2
-            larvae_per_m2 = final_count / LiveStreamService.ROI_AREA_M2
-            is_high = larvae_per_cm2 > LiveStreamService.DENSITY_THRESHOLD
-        else:
-            final_count = 0
-            larvae_per_cm2 = 0
-            larvae_per_m2 = 0
-            is_high = False
-        
-        # Update shared stats (thread-safe)
-        from datetime import datetime
-        LiveStreamService.current_stats = {
-            "larvae_count": final_count,
-            "density_cm2": round(larvae_per_cm2, 2),
-            "density_m2": round(larvae_per_m2, 1),
-            "is_high_density": is_high,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        # Get CLEAN annotated frame (bounding boxes only, NO labels/confidence)
-        annotated_frame = results.plot(
-            conf=False,        # ← Hide confidence scores
-            labels=False,      # ← Hide class labels
-            boxes=True,        # ✓ Show bounding boxes only
-            line_width=2
-        )
+            if not ret:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = cap.read()
+        if not ret:
+            return None
         
-        # Resize and encode
-        frame = cv2.resize(annotated_frame, (640, 480))
-        _, buffer = cv2.imencode(
-            ".jpg",
-            frame,
-            [int(cv2.IMWRITE_JPEG_QUALITY), 70]
-        )
-        return base64.b64encode(buffer).decode("utf-8")
+        pipeline = LiveStreamService.get_pipeline(camera_id)
+        results = None
+        if pipeline.needs_inference(frame):
+            with StageTimer.measure("inference"):
+                results = CameraManager.detect([pipeline.model_input(frame)])[0]
+        return pipeline.render(frame, time.time(), results, renditions=(rendition,))
     
     @staticmethod
-    async def start_video_stream(websocket):
-        """Send clean video frames"""
-        cap = cv2.VideoCapture(0)
-        
-        if not cap.isOpened():
-            print(f"❌ Cannot open video file")
-            return
-        
-        print(f"🎬 Playing video at 30 FPS (clean UI)")
-        loop = asyncio.get_event_loop()
+    async def start_video_stream(websocket, camera_id=None, mode="text", rendition=DEFAULT_RENDITION):
+        """
+        Send clean video frames from a camera's shared pipeline.
+        mode "binary" sends header + raw JPEG (see FrameProtocol), "overlay"
+        sends header + mask polygons + clean JPEG for the client to draw,
+        otherwise the legacy base64 text frames are sent.
+        rendition picks size / quality; the client can switch it at any time
+        by sending {"rendition": "<name>"}.
+        Frames go through the viewer's own bounded queue and sender task, so a
+        slow viewer only loses frames itself; one that stalls is disconnected.
+        """
+        pipeline = LiveStreamService.get_pipeline(camera_id)
+        client = f"{websocket.client.host}:{websocket.client.port}" if websocket.client else "unknown"
+        queue = pipeline.subscribe(client, mode, rendition)
+        print(f"🎬 Viewer joined camera {pipeline.camera_id} ({len(pipeline.subscribers)} watching, "
+              f"{mode} mode, {rendition})")
 
+        sender = asyncio.create_task(LiveStreamService._send_frames(websocket, pipeline, queue))
+        controls = asyncio.create_task(LiveStreamService._read_controls(websocket, queue))
+        try:
+            # Runs until the viewer disconnects (controls) or stops receiving (sender)
+            await asyncio.wait({sender, controls}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sender.cancel()
+            controls.cancel()
+            pipeline.unsubscribe(queue)
+            print(f"🎬 Viewer {client} left camera {pipeline.camera_id} "
+                  f"(sent {queue.sent}, dropped {queue.dropped})")
+
+    @staticmethod
+    async def _send_frames(websocket, pipeline, queue):
+        """Sender task of one viewer"""
         try:
             while True:
-                frame_data = await loop.run_in_executor(
-                    LiveStreamService.executor,
-                    LiveStreamService.capture_frame,
-                    cap
-                )
-                
-                if frame_data is None:
-                    break
+                frames = await queue.get()
+                frame = CameraPipeline.pick(frames, queue.rendition)
+                if queue.mode == "overlay":
+                    send = websocket.send_bytes(frame.as_overlay())
+                elif queue.mode == "binary":
+                    send = websocket.send_bytes(frame.as_binary())
+                else:
+                    send = websocket.send_text(frame.as_text())
 
-                await websocket.send_text(frame_data)
-                await asyncio.sleep(0.033)  # 30 FPS
+                start = time.perf_counter()
+                await asyncio.wait_for(send, timeout=CLIENT_STALL_TIMEOUT)
+                Metrics.observe("worm_ws_send_seconds", time.perf_counter() - start, endpoint="/ws/camera")
+                queue.mark_sent()
 
+        except asyncio.TimeoutError:
+            print(f"🐌 Viewer {queue.client} stalled for {CLIENT_STALL_TIMEOUT:.0f}s, disconnecting")
+            Metrics.inc("worm_client_stalls_total", camera=pipeline.camera_id)
+            try:
+                await websocket.close(code=1013)  # Try again later
+            except Exception:
+                pass
         except Exception as e:
             print("Video stream stopped:", e)
-        finally: 
-            cap.release()
+
+    @staticmethod
+    async def _read_controls(websocket, queue):
+        """Apply viewer control messages, e.g. {"rendition": "low"} to switch quality"""
+        try:
+            while True:
+                message = await websocket.receive_text()
+                try:
+                    rendition = json.loads(message).get("rendition")
+                except (ValueError, AttributeError):
+                    continue
+                if rendition in RENDITIONS and rendition != queue.rendition:
+                    print(f"🎚️ Viewer {queue.client} switched to {rendition}")
+                    queue.rendition = rendition
+        except Exception:
+            # Disconnected
+            pass
     
     @staticmethod
-    async def start_stats_stream(websocket):
-        """Send stats updates (lighter, ~10 updates per second)"""
+    async def start_stats_stream(websocket, camera_id=None, max_rate=None, coalesce_ms=0):
+        """
+        Send stats whenever they change (pushed by the camera's StatsHub).
+        max_rate caps updates per second, coalesce_ms batches bursts of changes.
+        """
+        pipeline = LiveStreamService.get_pipeline(camera_id)
+        subscription = pipeline.stats_hub.subscribe(
+            min_interval=1 / max_rate if max_rate else 0.0,
+            coalesce=coalesce_ms / 1000
+        )
         try:
             while True:
-                # Send current stats as JSON
-                stats_json = json.dumps(LiveStreamService.current_stats)
-                await websocket.send_text(stats_json)
-                await asyncio.sleep(0.1)  # 10 updates/sec (lighter than video)
+                stats_json = await subscription.next()
+                start = time.perf_counter()
+                await asyncio.wait_for(websocket.send_text(stats_json), timeout=CLIENT_STALL_TIMEOUT)
+                Metrics.observe("worm_ws_send_seconds", time.perf_counter() - start, endpoint="/ws/camera-stats")
                 
         except Exception as e:
-            print("Stats stream stopped:", e)
\ No newline at end of file
+            print("Stats stream stopped:", e)
+        finally:
+            pipeline.stats_hub.unsubscribe(subscription)
+
+
+@Metrics.collector
+def _video_client_metrics():
+    """Send queue depth and dropped frames of every connected video client"""
+    for pipeline in LiveStreamService.manager.pipelines.values():
+        for queue in list(pipeline.subscribers):
+            labels = {"camera": pipeline.camera_id, "client": queue.client}
+            yield "worm_client_queue_depth", labels, queue.qsize()
+            yield "worm_client_dropped_frames_total", labels, queue.dropped
@@ -0,0 +1,509 @@
+import asyncio
+import cv2
+import threading
+import time
+from datetime import datetime
+from queue import Queue, Full, Empty
+from app.services.client_queue import ClientQueue
+from app.services.frame_grabber import FrameGrabber
+from app.services.frame_protocol import EncodedFrame
+from app.services.inference_pool import InferenceProcess
+from app.services.jpeg_encoder import JpegEncoder
+from app.services.larva_metrics import LarvaMetrics
+from app.services.mask_overlay import MaskOverlay
+from app.services.mask_tracker import MaskTracker
+from app.services.model_registry import ModelRegistry
+from app.services.roi import RegionOfInterest
+from app.services.stats_hub import StatsHub
+from app.services.stats_history import StatsHistory
+from app.services.stage_timer import StageTimer
+from app.services.tiled_inference import TiledInference
+from app.core.config import (
+    KEYFRAME_INTERVAL, MOTION_THRESHOLD, OVERLAY_SIMPLIFY_PX, RENDITIONS, DEFAULT_RENDITION,
+    INFERENCE_WORKERS, RENDER_WORKERS, STAGE_QUEUE_SIZE, INFERENCE_PROCESSES, TILE_SIZE
+)
+
+
+class CameraPipeline:
+    """
+    Per-camera state: capture thread, keyframe tracker, latest stats and viewers.
+    Inference itself is batched across cameras by CameraManager; each frame is
+    then split into analyze (inference stage) and encode_frame (render stage).
+    """
+
+    def __init__(self, camera):
+        self.camera = camera
+        self.camera_id = camera["id"]
+        self.grabber = FrameGrabber(camera["source"])
+        self.subscribers = set()
+        self.stats_hub = StatsHub()
+        self.frame_seq = 0
+        self.frames_processed = 0
+        self.frames_stale = 0
+        self._last_seq = 0
+        self._rendered_seq = 0
+        self.inference_lock = threading.Lock()  # one inference worker per camera at a time
+        self.roi = RegionOfInterest(camera["roi_polygon"]) if camera.get("roi_polygon") else None
+        self._input_roi = None  # ROI the frame now in inference was cropped with
+        self.frame_size = None  # (w, h) of the last analyzed frame
+        self._render_lock = threading.Lock()
+
+        # Keyframe mode (KEYFRAME_INTERVAL > 1): YOLO every N frames, tracking in between
+        self.tracker = (
+            MaskTracker(KEYFRAME_INTERVAL, MOTION_THRESHOLD)
+            if KEYFRAME_INTERVAL > 1 else None
+        )
+
+        self.current_stats = {
+            "larvae_count": 0,
+            "density_cm2": 0,
+            "density_m2": 0,
+            "is_high_density": False,
+            "timestamp": ""
+        }
+        # (stats, full-size frame, overlay) of the newest detection, set together
+        # so alerts can snapshot exactly the frame their stats came from.
+        # overlay is None when the frame is already annotated, otherwise the
+        # (polygons, boxes) still to draw - see annotated_frame().
+        self.last_detection = (self.current_stats, None, None)
+
+    def subscribe(self, client="unknown", mode="text", rendition=DEFAULT_RENDITION):
+        """
+        Register a viewer. Returns its ClientQueue (bounded, drops the oldest frame).
+        mode "overlay" viewers get the clean frame + mask polygons, all others
+        get the overlay burned into the JPEG. rendition (see RENDITIONS) can be
+        changed later by setting queue.rendition.
+        """
+        queue = ClientQueue(client, mode, rendition)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def broadcast(self, frame_data):
+        for queue in list(self.subscribers):
+            queue.put(frame_data)
+
+    def status(self):
+        return {
+            "camera_id": self.camera_id,
+            **self.grabber.status(),
+            "frames_processed": self.frames_processed,
+            "frames_stale": self.frames_stale,
+            "viewers": len(self.subscribers),
+            "viewers_by_rendition": {
+                name: sum(1 for queue in self.subscribers if queue.rendition == name)
+                for name in RENDITIONS
+            },
+            "clients": [queue.status() for queue in list(self.subscribers)],
+            "stats_subscribers": len(self.stats_hub.subscribers),
+            "stats_publishes": self.stats_hub.publishes
+        }
+
+    def grab(self):
+        """Newest frame not yet processed as (seq, frame, captured_at), or None"""
+        grabbed = self.grabber.wait_for_frame(self._last_seq, timeout=0)
+        if grabbed is not None:
+            self._last_seq = grabbed[0]
+        return grabbed
+
+    def set_roi(self, polygon, area_cm2):
+        """Change the ROI polygon (None = whole frame) and its physical area; applies from the next frame"""
+        self.camera = {**self.camera, "roi_polygon": polygon, "roi_area_cm2": area_cm2}
+        self.roi = RegionOfInterest(polygon) if polygon else None
+
+    def model_input(self, frame):
+        """What the model sees for a frame: the ROI crop, or the whole frame without an ROI"""
+        self._input_roi = self.roi
+        if self._input_roi is None:
+            return frame
+        return self._input_roi.crop(frame)
+
+    def needs_inference(self, frame) -> bool:
+        """Whether this frame has to go through YOLO (always, unless keyframe mode skips it)"""
+        if self.tracker is None:
+            return True
+        self.tracker.prepare(frame)
+        return self.tracker.needs_keyframe()
+
+    def compute_stats(self, results):
+        return LarvaMetrics.compute(
+            results,
+            roi_area_cm2=self.camera["roi_area_cm2"],
+            avg_worm_area=self.camera["avg_worm_area"],
+            density_threshold=self.camera["density_threshold"]
+        )
+
+    def render(self, frame, captured_at, results, renditions=()):
+        """analyze + encode_frame in one go (used outside the staged live pipeline)"""
+        return self.encode_frame(frame, captured_at, self.analyze(frame, results), renditions)
+
+    def analyze(self, frame, results):
+        """
+        Inference-stage half of a frame: stats and detections.
+        results is None when keyframe mode carries this frame with the tracker.
+        Must run in frame order for a camera (the tracker is stateful).
+        Returns (seq, stats, results, polygons, boxes).
+        """
+        self.frame_size = (frame.shape[1], frame.shape[0])
+        if results is not None and self._input_roi is not None:
+            # Detections of the ROI crop -> frame coordinates
+            results = self._input_roi.to_frame(results, frame.shape)
+
+        if self.tracker is None:
+            with StageTimer.measure("mask_stats"):
+                stats = self.compute_stats(results)
+            polygons = boxes = None  # taken from results only if the render stage needs them
+        else:
+            if results is not None:
+                with StageTimer.measure("mask_stats"):
+                    stats = self.compute_stats(results)
+                self.tracker.set_keyframe(results, stats)
+            else:
+                with StageTimer.measure("track"):
+                    self.tracker.track()
+
+            stats = self.tracker.stats
+            # The tracker moves its polygons in place - keep a copy for this frame
+            polygons = [p.copy() for p in self.tracker.polygons]
+            boxes = self.tracker.boxes.copy()
+            results = None
+
+        self.frame_seq += 1
+        return self.frame_seq, stats, results, polygons, boxes
+
+    def encode_frame(self, frame, captured_at, analysis, renditions=()):
+        """
+        Render-stage half of a frame: overlay + JPEGs, as {rendition: EncodedFrame}.
+        Only renditions with viewers (plus the burned-in renditions asked for)
+        are encoded, each once; without any, nothing is plotted or encoded and
+        the result is empty. The overlay is only burned in (plot) when a text /
+        binary viewer needs it; overlay viewers get the clean frame and the
+        masks as polygons instead.
+        Safe to run on several render workers; returns None for a frame that
+        was overtaken by a newer one of the same camera.
+        """
+        seq, stats, results, polygons, boxes = analysis
+        if seq <= self._rendered_seq:
+            self.frames_stale += 1
+            return None
+
+        # What each watched rendition has to carry: "burned" JPEG and/or "overlay"
+        wanted = {}
+        for queue in list(self.subscribers):
+            wanted.setdefault(queue.rendition, set()).add(
+                "overlay" if queue.mode == "overlay" else "burned"
+            )
+        for name in renditions:
+            wanted.setdefault(name, set()).add("burned")
+        burn_in = any("burned" in kinds for kinds in wanted.values())
+        send_overlay = any("overlay" in kinds for kinds in wanted.values())
+
+        # Compact Detections (inference processes) have no plot() - draw their polygons.
+        # Polygons are also kept when nothing is burned in, for annotated_frame()
+        can_plot = hasattr(results, "plot")
+        if results is not None and (send_overlay or not can_plot or not burn_in):
+            polygons, boxes = MaskOverlay.from_results(results)
+
+        annotated_frame = frame
+        if burn_in:
+            with StageTimer.measure("plot"):
+                if can_plot:
+                    # Get CLEAN annotated frame (bounding boxes only, NO labels/confidence)
+                    annotated_frame = results.plot(
+                        conf=False,        # ← Hide confidence scores
+                        labels=False,      # ← Hide class labels
+                        boxes=True,        # ✓ Show bounding boxes only
+                        line_width=2
+                    )
+                elif polygons:
+                    annotated_frame = MaskOverlay.draw(frame, polygons, boxes)
+
+        h, w = frame.shape[:2]
+        frames = {}
+        for name, kinds in wanted.items():
+            width, height, quality = RENDITIONS[name]
+            jpeg = clean_jpeg = overlay = None
+            if "burned" in kinds:
+                jpeg = self.encode(annotated_frame, (width, height), quality)
+            if "overlay" in kinds:
+                clean_jpeg = self.encode(frame, (width, height), quality)
+                overlay = MaskOverlay.pack(polygons, boxes, (w, h), (width, height), OVERLAY_SIMPLIFY_PX)
+            frames[name] = EncodedFrame(seq, captured_at, jpeg, stats,
+                                        clean_jpeg=clean_jpeg, overlay=overlay)
+
+        with self._render_lock:
+            if seq <= self._rendered_seq:
+                self.frames_stale += 1
+                return None
+            self._rendered_seq = seq
+            self.frames_processed += 1
+            self.current_stats = {
+                "larvae_count": stats["larvae_count"],
+                "density_cm2": round(stats["density_cm2"], 2),
+                "density_m2": round(stats["density_m2"], 1),
+                "is_high_density": stats["is_high_density"],
+                "timestamp": datetime.now().isoformat()
+            }
+            self.last_detection = (
+                self.current_stats,
+                annotated_frame,
+                None if burn_in else (polygons, boxes)
+            )
+        return frames
+
+    @staticmethod
+    def encode(image, size, quality) -> bytes:
+        """Resize to size (w, h) and JPEG-encode"""
+        with StageTimer.measure("resize"):
+            image = cv2.resize(image, size)
+        with StageTimer.measure("jpeg_encode"):
+            return JpegEncoder.encode(image, quality)
+
+    @staticmethod
+    def pick(frames, rendition):
+        """A viewer's rendition from render()'s output (any one if it was not encoded this frame)"""
+        frame = frames.get(rendition)
+        if frame is None:
+            frame = frames.get(DEFAULT_RENDITION) or next(iter(frames.values()))
+        return frame
+
+    @staticmethod
+    def annotated_frame(detection):
+        """Full-size annotated frame of a last_detection (draws the overlay if it was sent as polygons)"""
+        _, frame, overlay = detection
+        if frame is not None and overlay is not None:
+            frame = MaskOverlay.draw(frame, *overlay)
+        return frame
+
+
+class CameraManager:
+    """
+    Runs every camera through three stages connected by bounded queues:
+
+        capture    one FrameGrabber thread per camera (keeps only the newest frame)
+        inference  inference_workers threads (one unless inference_processes);
+                   each takes the newest frame of every camera no other worker
+                   is busy with and runs them through one batched model call,
+                   then updates stats / tracker in frame order
+        render     render_workers threads: plot, resize and JPEG encode
+
+    The stages overlap, so frame N+1 is already in the model while frame N is
+    being encoded. Finished frames are handed to the event loop for the
+    viewers. Inference is paced against deadlines at target_fps; when
+    rendering falls behind, the oldest frame waiting in the render queue is
+    dropped.
+
+    With inference_processes, each inference worker hands its batches to its
+    own detector process (InferenceProcess) instead of calling the model
+    in-process, so the model no longer competes with the web process's GIL.
+    """
+
+    def __init__(self, cameras, target_fps=30, inference_workers=INFERENCE_WORKERS,
+                 render_workers=RENDER_WORKERS, queue_size=STAGE_QUEUE_SIZE,
+                 inference_processes=INFERENCE_PROCESSES):
+        self.pipelines = {camera["id"]: CameraPipeline(camera) for camera in cameras}
+        self.default_id = cameras[0]["id"]
+        self.target_fps = target_fps
+        if inference_workers > 1 and not inference_processes:
+            # In-process workers would share one YOLO instance, and ultralytics
+            # predictors are not thread-safe
+            print("⚠️ INFERENCE_WORKERS > 1 needs INFERENCE_PROCESSES=1, using one inference worker")
+            inference_workers = 1
+        self.inference_workers = max(1, inference_workers)
+        self.render_workers = max(1, render_workers)
+        self.inference_processes = inference_processes
+        self.detectors = []
+        self.render_queue = Queue(maxsize=max(1, queue_size))
+        self.ticks = 0
+        self.deadlines_missed = 0
+        self.last_batch_size = 0
+        self.render_dropped = 0
+        self._threads = []
+        self._stop = threading.Event()
+        self._loop = None
+
+    def get(self, camera_id=None):
+        """Pipeline for a camera id (default camera when None), or None if unknown"""
+        return self.pipelines.get(camera_id or self.default_id)
+
+    def start(self):
+        """Start the capture, inference and render threads (call from the running event loop)"""
+        if self._threads:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        for pipeline in self.pipelines.values():
+            pipeline.grabber.start()
+
+        for i in range(self.inference_workers):
+            self._threads.append(threading.Thread(
+                target=self._inference_worker, name=f"inference-{i}", daemon=True
+            ))
+        for i in range(self.render_workers):
+            self._threads.append(threading.Thread(
+                target=self._render_worker, name=f"render-{i}", daemon=True
+            ))
+        for thread in self._threads:
+            thread.start()
+
+        print(f"🎬 {len(self.pipelines)} camera pipeline(s) running at up to {self.target_fps} FPS "
+              f"({self.inference_workers} inference / {self.render_workers} render worker(s), "
+              f"{JpegEncoder.backend} JPEG)")
+
+    async def stop(self):
+        """Stop the stage threads and release the cameras"""
+        if not self._threads:
+            return
+        self._stop.set()
+
+        loop = asyncio.get_running_loop()
+        for thread in self._threads:
+            await loop.run_in_executor(None, thread.join)
+        self._threads = []
+
+        for pipeline in self.pipelines.values():
+            await loop.run_in_executor(None, pipeline.grabber.stop)
+
+    def status(self):
+        return {
+            "target_fps": self.target_fps,
+            "ticks": self.ticks,
+            "deadlines_missed": self.deadlines_missed,
+            "last_batch_size": self.last_batch_size,
+            "inference_workers": self.inference_workers,
+            "inference_processes": [d.status() for d in self.detectors],
+            "render_workers": self.render_workers,
+            "render_queue": self.render_queue.qsize(),
+            "render_dropped": self.render_dropped,
+            "jpeg_encoder": JpegEncoder.backend,
+            "cameras": [p.status() for p in self.pipelines.values()]
+        }
+
+    @staticmethod
+    def detect(frames):
+        """One batched YOLO call for a list of frames (tiled when TILE_SIZE is set)"""
+        model = ModelRegistry.get("live")
+        if TILE_SIZE:
+            return TiledInference.detect(model, frames)
+        return model(frames, imgsz=640, conf=0.4, verbose=False)
+
+    def process_tick(self, detect=None) -> int:
+        """
+        Inference stage, one tick: batch the newest frame of every camera this
+        worker could claim and queue them for rendering. Returns the frame count.
+        detect replaces the in-process model call (e.g. InferenceProcess.detect).
+        """
+        detect = detect or self.detect
+        # A camera is handled by one inference worker at a time, so its frames stay in order
+        claimed = [p for p in self.pipelines.values() if p.inference_lock.acquire(blocking=False)]
+        try:
+            grabbed = []
+            for pipeline in claimed:
+                item = pipeline.grab()
+                if item is not None:
+                    grabbed.append((pipeline, item))
+
+            if not grabbed:
+                return 0
+
+            infer = [pipeline.needs_inference(frame) for pipeline, (_, frame, _) in grabbed]
+            batch = [
+                pipeline.model_input(frame)
+                for (pipeline, (_, frame, _)), needed in zip(grabbed, infer) if needed
+            ]
+            self.last_batch_size = len(batch)
+            if batch:
+                with StageTimer.measure("inference"):
+                    results = iter(detect(batch))
+            else:
+                results = iter([])
+
+            for (pipeline, (_, frame, captured_at)), needed in zip(grabbed, infer):
+                analysis = pipeline.analyze(frame, next(results) if needed else None)
+                self._queue_render((pipeline, frame, captured_at, analysis))
+            return len(grabbed)
+        finally:
+            for pipeline in claimed:
+                pipeline.inference_lock.release()
+
+    def _queue_render(self, item):
+        """Hand a frame to the render stage, dropping the oldest waiting one when full"""
+        while True:
+            try:
+                self.render_queue.put_nowait(item)
+                return
+            except Full:
+                try:
+                    self.render_queue.get_nowait()
+                    self.render_dropped += 1
+                except Empty:
+                    pass
+
+    def _inference_worker(self):
+        interval = 1 / self.target_fps
+        deadline = time.monotonic()
+
+        detector = None
+        if self.inference_processes:
+            # Ring of two batches' worth of frame slots (one frame per camera per batch)
+            detector = InferenceProcess(slots=2 * len(self.pipelines))
+            self.detectors.append(detector)
+
+        try:
+            self._inference_loop(detector.detect if detector else None, interval, deadline)
+        finally:
+            if detector is not None:
+                detector.close()
+                self.detectors.remove(detector)
+
+    def _inference_loop(self, detect, interval, deadline):
+        while not self._stop.is_set():
+            try:
+                processed = self.process_tick(detect)
+            except Exception as e:
+                # e.g. model failed to load - back off instead of failing every tick
+                print(f"⚠️ Camera tick failed: {e}")
+                self._stop.wait(1)
+                processed = 0
+            self.ticks += 1
+
+            # Deadline pacing: sleep only for what is left of this tick's slot
+            deadline += interval
+            now = time.monotonic()
+            if now < deadline:
+                self._stop.wait(deadline - now)
+            else:
+                # Processing overran the slot - restart the schedule from now
+                if processed:
+                    self.deadlines_missed += 1
+                deadline = now
+
+    def _render_worker(self):
+        while not self._stop.is_set():
+            try:
+                pipeline, frame, captured_at, analysis = self.render_queue.get(timeout=0.5)
+            except Empty:
+                continue
+
+            try:
+                frames = pipeline.encode_frame(frame, captured_at, analysis)
+            except Exception as e:
+                print(f"⚠️ Render failed for camera {pipeline.camera_id}: {e}")
+                continue
+
+            if frames is not None:
+                try:
+                    self._loop.call_soon_threadsafe(self._deliver, pipeline, frames)
+                except RuntimeError:
+                    return  # Event loop closed (shutdown)
+
+    @staticmethod
+    def _deliver(pipeline, frames):
+        """Event loop side: fan a finished frame out to viewers, stats and history"""
+        if frames:
+            # Empty when nobody was watching at render time
+            pipeline.broadcast(frames)
+        pipeline.stats_hub.publish(pipeline.current_stats)
+        StatsHistory.record(pipeline.camera_id, pipeline.current_stats)
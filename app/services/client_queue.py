@@ -0,0 +1,54 @@
+import asyncio
+import time
+from collections import deque
+from app.core.config import CLIENT_QUEUE_SIZE
+
+
+class ClientQueue:
+    """
+    Bounded send queue of one video viewer.
+    put() never blocks the camera loop: when the viewer falls behind, the
+    oldest queued frame is dropped (and counted). The viewer's own sender
+    task takes frames with get(), so a slow link only delays that viewer.
+    """
+
+    def __init__(self, client, mode="text", rendition=None, maxsize=CLIENT_QUEUE_SIZE):
+        self.client = client
+        self.mode = mode
+        self.rendition = rendition
+        self.sent = 0
+        self.dropped = 0
+        self.connected_at = time.time()
+        self.last_sent_at = None
+        self._frames = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+
+    def put(self, frames):
+        if len(self._frames) == self._frames.maxlen:
+            self.dropped += 1  # deque drops the oldest frame on append
+        self._frames.append(frames)
+        self._ready.set()
+
+    async def get(self):
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()
+
+    def qsize(self) -> int:
+        return len(self._frames)
+
+    def mark_sent(self):
+        self.sent += 1
+        self.last_sent_at = time.time()
+
+    def status(self):
+        return {
+            "client": self.client,
+            "mode": self.mode,
+            "rendition": self.rendition,
+            "queued": len(self._frames),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "connected_for": round(time.time() - self.connected_at, 1)
+        }
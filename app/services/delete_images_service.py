@@ -1,62 +1,107 @@
+import asyncio
 from app.repositories.saved_images_dao import SavedImagesDAO
-from app.core.supabase_client import supabase
+from app.core.supabase_client import supabase, run_supabase
+from app.core.config import DELETE_CHUNK_SIZE, DELETE_CONCURRENCY
+from app.services.job_manager import JobManager
+from app.core.read_cache import ReadCache
 
 class DeleteImagesService:
+    DB_DELETE_ATTEMPTS = 3  # a chunk's rows are retried after its storage objects are gone
+    
+    @staticmethod
+    def start_delete_all():
+        """
+        Start deleting all saved images in the background.
+        Returns the job record; poll /api/jobs/{id} for progress.
+        """
+        return JobManager.submit("delete_all_images", DeleteImagesService.delete_all_saved_images)
+
     @staticmethod
-    def delete_all_saved_images():
+    async def delete_all_saved_images(job):
         """
         Delete all saved images from both database and Supabase Storage.
-        Returns a summary of the deletion operation.
+        Storage objects are removed in chunks with bounded concurrency and each
+        chunk's database rows are deleted right after, so images whose storage
+        delete failed keep their row. The table is walked in id order one page
+        at a time (a single select is capped at PostgREST's max-rows), so every
+        row is reached. Returns a summary of the deletion operation.
         """
-        try:
-            # Get all image URLs first before deleting from DB
-            saved_images = SavedImagesDAO.get_all()
-            
-            if not saved_images:
-                print("ℹ️ No images to delete")
-                return {
-                    "success": True,
-                    "message": "No images found to delete",
-                    "deleted_count": 0
-                }
-            
-            deleted_from_storage = 0
-            failed_storage_deletes = []
+        total = await run_supabase(SavedImagesDAO.count)
+        if not total:
+            print("ℹ️ No images to delete")
+            return {
+                "success": True,
+                "message": "No images found to delete",
+                "deleted_count": 0
+            }
+        
+        JobManager.set_progress(job, 0, total)
+        bucket = supabase.storage.from_("snapshots")
+        semaphore = asyncio.Semaphore(DELETE_CONCURRENCY)
+        counts = {"done": 0, "storage_deleted": 0, "db_deleted": 0, "seen": 0}
+        failed_storage_deletes = []
+        failed_db_deletes = []
+        
+        async def delete_chunk(chunk):
+            # Extract filenames from URLs
+            filenames = [image.get("image_metadata", "").split("/")[-1] for image in chunk]
+            ids = [image["id"] for image in chunk]
             
-            # Delete from Supabase Storage
-            bucket = supabase.storage.from_("snapshots")
-            for image in saved_images:
+            async with semaphore:
                 try:
-                    # Extract filename from URL
-                    url = image.get("image_metadata", "")
-                    filename = url.split("/")[-1]
-                    
-                    bucket.remove([filename])
-                    deleted_from_storage += 1
-                    print(f"🗑️ Deleted from storage: {filename}")
-                    
+                    await run_supabase(bucket.remove, filenames)
+                    counts["storage_deleted"] += len(chunk)
                 except Exception as e:
-                    failed_storage_deletes.append(filename)
-                    print(f"⚠️ Failed to delete {filename} from storage: {e}")
+                    # Rows are kept, so the images can still be listed and deleted again
+                    failed_storage_deletes.extend(filenames)
+                    print(f"⚠️ Failed to delete {len(chunk)} images from storage: {e}")
+                else:
+                    # The objects are gone - the rows must follow, or they point at nothing
+                    for attempt in range(1, DeleteImagesService.DB_DELETE_ATTEMPTS + 1):
+                        try:
+                            await run_supabase(SavedImagesDAO.delete_by_ids, ids)
+                            counts["db_deleted"] += len(chunk)
+                            print(f"🗑️ Deleted {len(chunk)} images from storage and DB")
+                            break
+                        except Exception as e:
+                            if attempt == DeleteImagesService.DB_DELETE_ATTEMPTS:
+                                failed_db_deletes.extend(ids)
+                                print(f"⚠️ Deleted {len(chunk)} images from storage but not their rows: {e}")
+                            else:
+                                await asyncio.sleep(attempt)
             
-            # Delete all from database
-            SavedImagesDAO.delete_all()
+            counts["done"] += len(chunk)
+            JobManager.set_progress(job, counts["done"])
+        
+        last_id = None
+        while True:
+            page = await run_supabase(SavedImagesDAO.get_batch, last_id, DELETE_CHUNK_SIZE * DELETE_CONCURRENCY)
+            if not page:
+                break
             
-            result = {
-                "success": True,
-                "message": "All saved images deleted successfully",
-                "total_images": len(saved_images),
-                "deleted_from_storage": deleted_from_storage,
-                "failed_storage_deletes": failed_storage_deletes,
-                "deleted_from_db": len(saved_images)
-            }
+            # Rows added since the count keep the total honest
+            counts["seen"] += len(page)
+            total = max(total, counts["seen"])
+            JobManager.set_progress(job, counts["done"], total)
             
-            print(f"✅ Deletion complete: {result}")
-            return result
-            
-        except Exception as e:
-            print(f"❌ Failed to delete all saved images: {e}")
-            raise
+            last_id = page[-1]["id"]
+            chunks = [page[i:i + DELETE_CHUNK_SIZE] for i in range(0, len(page), DELETE_CHUNK_SIZE)]
+            await asyncio.gather(*(delete_chunk(chunk) for chunk in chunks))
+        
+        success = not failed_storage_deletes and not failed_db_deletes
+        result = {
+            "success": success,
+            "message": "All saved images deleted successfully" if success
+                       else "Some images could not be deleted",
+            "total_images": counts["seen"],
+            "deleted_from_storage": counts["storage_deleted"],
+            "failed_storage_deletes": failed_storage_deletes,
+            "deleted_from_db": counts["db_deleted"],
+            "failed_db_deletes": failed_db_deletes  # row ids whose storage object is already gone
+        }
+        
+        print(f"✅ Deletion complete: {result}")
+        return result
     
     @staticmethod
     def delete_image_by_url(image_url: str):
@@ -78,6 +123,7 @@ class DeleteImagesService:
                 .eq("image_metadata", image_url)\
                 .execute()
             
+            ReadCache.invalidate(SavedImagesDAO.TABLE)
             print(f"✅ Image deleted: {image_url}")
             return {
                 "success": True,
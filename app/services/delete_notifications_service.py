@@ -1,40 +1,81 @@
+import asyncio
 from app.repositories.previous_notification_dao import PreviousNotificationDAO
-from app.core.supabase_client import supabase
+from app.core.supabase_client import supabase, run_supabase
+from app.core.config import DELETE_CHUNK_SIZE, DELETE_CONCURRENCY
+from app.services.job_manager import JobManager
+from app.core.read_cache import ReadCache
 
 class DeleteNotificationsService:
     @staticmethod
-    def delete_all_notifications():
+    def start_delete_all():
         """
-        Delete all previous notifications from the database.
-        Returns a summary of the deletion operation.
+        Start deleting all notifications in the background.
+        Returns the job record; poll /api/jobs/{id} for progress.
         """
-        try:
-            # Get all notifications first
-            notifications = PreviousNotificationDAO.get_all()
-            
-            if not notifications:
-                print("ℹ️ No notifications to delete")
-                return {
-                    "success": True,
-                    "message": "No notifications found to delete",
-                    "deleted_count": 0
-                }
-            
-            # Delete all from database
-            PreviousNotificationDAO.delete_all()
-            
-            result = {
+        return JobManager.submit("delete_all_notifications", DeleteNotificationsService.delete_all_notifications)
+
+    @staticmethod
+    async def delete_all_notifications(job):
+        """
+        Delete all previous notifications from the database in id batches
+        with bounded concurrency. The table is walked in id order one page at
+        a time (a single select is capped at PostgREST's max-rows), so every
+        row is reached. Returns a summary of the deletion operation.
+        """
+        total = await run_supabase(PreviousNotificationDAO.count)
+        if not total:
+            print("ℹ️ No notifications to delete")
+            return {
                 "success": True,
-                "message": "All notifications deleted successfully",
-                "deleted_count": len(notifications)
+                "message": "No notifications found to delete",
+                "deleted_count": 0
             }
+        
+        JobManager.set_progress(job, 0, total)
+        semaphore = asyncio.Semaphore(DELETE_CONCURRENCY)
+        counts = {"done": 0, "deleted": 0, "seen": 0}
+        
+        async def delete_batch(ids):
+            async with semaphore:
+                try:
+                    await run_supabase(PreviousNotificationDAO.delete_by_ids, ids)
+                    counts["deleted"] += len(ids)
+                except Exception as e:
+                    print(f"⚠️ Failed to delete {len(ids)} notifications: {e}")
             
-            print(f"✅ Deletion complete: {result}")
-            return result
+            counts["done"] += len(ids)
+            JobManager.set_progress(job, counts["done"])
+        
+        last_id = None
+        while True:
+            page = await run_supabase(
+                PreviousNotificationDAO.get_batch, last_id, DELETE_CHUNK_SIZE * DELETE_CONCURRENCY
+            )
+            if not page:
+                break
             
-        except Exception as e:
-            print(f"❌ Failed to delete all notifications: {e}")
-            raise
+            # Rows added since the count keep the total honest
+            counts["seen"] += len(page)
+            total = max(total, counts["seen"])
+            JobManager.set_progress(job, counts["done"], total)
+            
+            ids = [notification["id"] for notification in page]
+            last_id = ids[-1]
+            await asyncio.gather(*(
+                delete_batch(ids[i:i + DELETE_CHUNK_SIZE])
+                for i in range(0, len(ids), DELETE_CHUNK_SIZE)
+            ))
+        
+        success = counts["deleted"] == counts["seen"]
+        result = {
+            "success": success,
+            "message": "All notifications deleted successfully" if success
+                       else "Some notifications could not be deleted",
+            "deleted_count": counts["deleted"]
+        }
+        
+        print(f"✅ Deletion complete: {result}")
+        return result
     
     @staticmethod
     def delete_notification_by_id(notification_id: int):
@@ -47,6 +88,7 @@ class DeleteNotificationsService:
                 .eq("id", notification_id)\
                 .execute()
             
+            ReadCache.invalidate(PreviousNotificationDAO.TABLE)
             print(f"✅ Notification deleted: ID {notification_id}")
             return {
                 "success": True,
@@ -0,0 +1,26 @@
+import numpy as np
+from app.services.larva_metrics import LarvaMetrics
+from app.services.mask_overlay import MaskOverlay
+
+
+class Detections:
+    """
+    Compact, picklable stand-in for one YOLO segmentation result.
+    Carries only what the live pipeline reads - per-mask pixel areas, mask
+    polygons and boxes - so inference processes return a few KB per frame
+    instead of the N x H x W mask stack. LarvaMetrics.compute and
+    MaskOverlay.from_results accept it in place of an ultralytics result.
+    """
+
+    __slots__ = ("areas", "polygons", "boxes")
+
+    def __init__(self, areas, polygons, boxes):
+        self.areas = areas
+        self.polygons = polygons
+        self.boxes = boxes
+
+    @staticmethod
+    def from_results(results):
+        polygons, boxes = MaskOverlay.from_results(results)
+        areas = np.asarray(LarvaMetrics.mask_areas(results.masks), dtype=np.float32)
+        return Detections(areas, polygons, boxes)
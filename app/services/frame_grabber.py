@@ -0,0 +1,124 @@
+import threading
+import time
+import cv2
+from app.services.stage_timer import StageTimer
+
+
+class FrameGrabber:
+    """
+    Reads a camera continuously on its own thread and keeps only the newest frame.
+    Consumers always get the most recent image instead of whatever has been
+    sitting in the driver buffer, and frames they never picked up are counted
+    as dropped.
+    """
+
+    REOPEN_DELAY = 2  # seconds to wait before retrying a camera that failed to open
+
+    def __init__(self, source):
+        self.source = source
+        self.frames_captured = 0
+        self.frames_dropped = 0
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._captured_at = 0.0
+        self._seq = 0
+        self._consumed_seq = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"grabber-{self.source}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def wait_for_frame(self, after_seq, timeout=1.0):
+        """
+        Block until a frame newer than after_seq is available.
+        Returns (seq, frame, captured_at), or None on timeout / stop.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._seq > after_seq or self._stop.is_set(), timeout
+            ):
+                return None
+            if self._stop.is_set():
+                return None
+            self._consumed_seq = self._seq
+            return self._seq, self._frame, self._captured_at
+
+    def read(self):
+        """cv2.VideoCapture-style read of the newest frame (a copy, not marked consumed)"""
+        with self._cond:
+            if self._frame is None:
+                return False, None
+            return True, self._frame.copy()
+
+    def status(self):
+        return {
+            "source": self.source,
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped
+        }
+
+    def _publish(self, frame):
+        with self._cond:
+            if self._seq > self._consumed_seq:
+                # Previous frame was never picked up
+                self.frames_dropped += 1
+            self._frame = frame
+            self._captured_at = time.time()
+            self._seq += 1
+            self.frames_captured += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        is_file = isinstance(self.source, str)
+
+        while not self._stop.is_set():
+            cap = cv2.VideoCapture(self.source)
+            if not cap.isOpened():
+                print(f"❌ Cannot open camera {self.source}, retrying in {self.REOPEN_DELAY}s")
+                cap.release()
+                self._stop.wait(self.REOPEN_DELAY)
+                continue
+
+            # Video files are read at their own frame rate to behave like a camera
+            file_interval = 0
+            if is_file:
+                fps = cap.get(cv2.CAP_PROP_FPS) or 30
+                file_interval = 1 / fps
+
+            print(f"📷 Capture thread running for camera {self.source}")
+
+            try:
+                while not self._stop.is_set():
+                    with StageTimer.measure("capture"):
+                        ret, frame = cap.read()
+
+                    if not ret and is_file:
+                        # Loop the video
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        ret, frame = cap.read()
+
+                    if not ret:
+                        print(f"⚠️ Camera {self.source} stopped delivering frames, reopening")
+                        break
+
+                    self._publish(frame)
+
+                    if file_interval:
+                        self._stop.wait(file_interval)
+            finally:
+                cap.release()
@@ -0,0 +1,99 @@
+import base64
+import struct
+
+
+class FrameProtocol:
+    """
+    Binary /ws/camera frame layout (little-endian, 28-byte header + JPEG):
+
+        magic         2s   b"WF"
+        version       u8   1
+        flags         u8   bit 0 = high density
+        seq           u32  frame sequence number
+        timestamp     f64  capture time (unix seconds)
+        larvae_count  u32
+        density_cm2   f32
+        density_m2    f32
+        jpeg          ...  rest of the message
+
+    With flag bit 1 (overlay mode) an overlay section sits between the header
+    and the JPEG: u32 length + MaskOverlay bytes. The JPEG is then the clean
+    frame and the client draws the masks itself.
+    """
+
+    MAGIC = b"WF"
+    VERSION = 1
+    HEADER = struct.Struct("<2sBBIdIff")
+    HEADER_SIZE = HEADER.size
+
+    FLAG_HIGH_DENSITY = 0x01
+    FLAG_OVERLAY = 0x02
+    OVERLAY_LENGTH = struct.Struct("<I")
+
+    @staticmethod
+    def pack_header(seq, timestamp, stats, overlay=False) -> bytes:
+        flags = FrameProtocol.FLAG_HIGH_DENSITY if stats["is_high_density"] else 0
+        if overlay:
+            flags |= FrameProtocol.FLAG_OVERLAY
+        return FrameProtocol.HEADER.pack(
+            FrameProtocol.MAGIC,
+            FrameProtocol.VERSION,
+            flags,
+            seq & 0xFFFFFFFF,
+            timestamp,
+            stats["larvae_count"],
+            stats["density_cm2"],
+            stats["density_m2"]
+        )
+
+
+class EncodedFrame:
+    """
+    One processed frame as produced by the camera pipeline.
+    The wire formats are built lazily and cached, so each is made at most
+    once per frame no matter how many viewers use it.
+    jpeg has the overlay burned in; clean_jpeg + overlay (MaskOverlay bytes)
+    are only set when overlay-mode viewers are connected. A viewer that joins
+    mid-frame gets whichever JPEG exists.
+    """
+
+    __slots__ = ("seq", "timestamp", "jpeg", "stats", "clean_jpeg", "overlay",
+                 "_text", "_binary", "_overlay_message")
+
+    def __init__(self, seq, timestamp, jpeg: bytes, stats, clean_jpeg: bytes = None, overlay: bytes = None):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.jpeg = jpeg
+        self.stats = stats
+        self.clean_jpeg = clean_jpeg
+        self.overlay = overlay
+        self._text = None
+        self._binary = None
+        self._overlay_message = None
+
+    def as_text(self) -> str:
+        """Legacy format: base64 JPEG string"""
+        if self._text is None:
+            self._text = base64.b64encode(self.jpeg or self.clean_jpeg).decode("utf-8")
+        return self._text
+
+    def as_binary(self) -> bytes:
+        """Header + raw JPEG bytes"""
+        if self._binary is None:
+            header = FrameProtocol.pack_header(self.seq, self.timestamp, self.stats)
+            self._binary = header + (self.jpeg or self.clean_jpeg)
+        return self._binary
+
+    def as_overlay(self) -> bytes:
+        """Header + overlay section + clean JPEG (plain binary frame if no overlay was made)"""
+        if self.overlay is None:
+            return self.as_binary()
+        if self._overlay_message is None:
+            header = FrameProtocol.pack_header(self.seq, self.timestamp, self.stats, overlay=True)
+            self._overlay_message = b"".join((
+                header,
+                FrameProtocol.OVERLAY_LENGTH.pack(len(self.overlay)),
+                self.overlay,
+                self.clean_jpeg
+            ))
+        return self._overlay_message
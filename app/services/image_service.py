@@ -1,34 +1,35 @@
 import cv2
-import os
 from datetime import datetime
 from app.core.supabase_client import supabase
 
 class ImageService:
     @staticmethod
-    def capture_and_upload_snapshot(cap) -> str:
+    def encode_snapshot(frame) -> bytes:
+        """Resize to the standard snapshot size and JPEG-encode in memory"""
+        frame = cv2.resize(frame, (640, 480))
+        ok, buffer = cv2.imencode(".jpg", frame)
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buffer.tobytes()
+
+    @staticmethod
+    def upload_snapshot(frame, camera_id=None) -> str:
         """
-        Capture a frame from the live stream and upload to Supabase Storage.
+        Encode a frame in memory and upload it to Supabase Storage (no temp files).
+        Blocking - call it from an executor (see run_supabase).
         Returns the public URL of the uploaded image.
         """
-        ret, frame = cap.read()
-        if not ret:
-            print("❌ Failed to capture frame")
+        if frame is None:
+            print("❌ No frame to snapshot")
             return None
 
-        # Resize for standard size
-        frame = cv2.resize(frame, (640, 480))
-
-        # Create local temporary file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"snapshot_{timestamp}.jpg"
-        tmp_path = os.path.join("snapshots_temp", filename)
-        os.makedirs("snapshots_temp", exist_ok=True)
-        cv2.imwrite(tmp_path, frame)
+        prefix = f"snapshot_{camera_id}" if camera_id else "snapshot"
+        filename = f"{prefix}_{timestamp}.jpg"
 
         # Upload to Supabase Storage
         try:
-            with open(tmp_path, 'rb') as f:
-                file_data = f.read()
+            file_data = ImageService.encode_snapshot(frame)
             
             bucket = supabase.storage.from_("snapshots")
             bucket.upload(
@@ -43,9 +44,4 @@ class ImageService:
             
         except Exception as e:
             print(f"❌ Failed to upload snapshot: {e}")
-            return None
-            
-        finally:
-            # Remove local file after upload
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
\ No newline at end of file
+            return None
\ No newline at end of file
@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import queue
+import numpy as np
+from multiprocessing import shared_memory
+from app.services.detections import Detections
+from app.services.model_registry import ModelRegistry
+from app.services.tiled_inference import TiledInference
+from app.core.config import INFERENCE_MAX_FRAME, INFERENCE_PROCESS_THREADS, TILE_SIZE
+
+
+class InferenceProcess:
+    """
+    The live detector in a separate process, so inference does not share the
+    GIL with plotting, encoding and the event loop.
+
+    Frames are copied into a preallocated shared-memory ring of frame slots
+    (no pickling of frames); the process only gets (slot, shape) tuples and
+    sends back compact Detections. One InferenceProcess is driven by one
+    inference worker thread, which waits for each batch.
+    """
+
+    RESULT_POLL = 1.0  # seconds between liveness checks while waiting
+
+    def __init__(self, slots, max_frame=INFERENCE_MAX_FRAME, role="live"):
+        width, height = max_frame
+        self.slots = slots
+        self.slot_bytes = width * height * 3
+        self.role = role
+        self.batches = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self._next_slot = 0
+        self._process = None
+        self._tasks = None
+        self._results = None
+        self._weights = None
+
+    def _start(self):
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.slot_bytes, self._tasks, self._results, INFERENCE_PROCESS_THREADS),
+            name=f"inference-process-{self._shm.name}",
+            daemon=True
+        )
+        self._process.start()
+        self._weights = None
+        print(f"🧠 Inference process started (pid {self._process.pid}, {self.slots} frame slots)")
+
+    def detect(self, frames):
+        """Batched detection of frames in the worker process. Returns one Detections per frame."""
+        if len(frames) > self.slots:
+            raise ValueError(f"Batch of {len(frames)} frames does not fit {self.slots} ring slots")
+        if self._process is None or not self._process.is_alive():
+            self._start()
+
+        # Follow model swaps (ModelRegistry.swap) made in the web process
+        weights = ModelRegistry.path(self.role)
+        if weights != self._weights:
+            # Only remembered once the process confirms the load, so a failed load is retried
+            self._tasks.put(("load", str(weights)))
+            status, payload = self._wait_result()
+            if status == "error":
+                raise RuntimeError(f"Inference process failed to load {weights.name}: {payload}")
+            self._weights = weights
+
+        entries = []
+        for frame in frames:
+            if frame.nbytes > self.slot_bytes or frame.dtype != np.uint8:
+                raise ValueError(f"Frame {frame.shape} does not fit a ring slot (raise INFERENCE_MAX_FRAME)")
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.slots
+            view = np.ndarray(frame.shape, np.uint8, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+            view[...] = frame
+            entries.append((slot, frame.shape))
+
+        self._tasks.put(("detect", entries))
+        status, payload = self._wait_result()
+        if status == "error":
+            raise RuntimeError(f"Inference process failed: {payload}")
+        self.batches += 1
+        return payload
+
+    def _wait_result(self):
+        """(status, payload) of the last task, failing if the process dies meanwhile"""
+        while True:
+            try:
+                return self._results.get(timeout=self.RESULT_POLL)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError(f"Inference process exited (code {self._process.exitcode})")
+
+    def close(self):
+        """Stop the process and free the shared memory"""
+        if self._process is not None:
+            if self._process.is_alive():
+                self._tasks.put(None)
+                self._process.join(timeout=5)
+                if self._process.is_alive():
+                    self._process.terminate()
+            self._process = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def status(self):
+        return {
+            "pid": self._process.pid if self._process is not None else None,
+            "alive": self._process is not None and self._process.is_alive(),
+            "weights": self._weights.name if self._weights is not None else None,
+            "slots": self.slots,
+            "batches": self.batches
+        }
+
+
+def _worker_main(shm_name, slot_bytes, tasks, results, torch_threads):
+    """Entry point of an inference process"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    if torch_threads > 0:
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+
+    from ultralytics import YOLO
+    model = None
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            kind, payload = task
+
+            try:
+                if kind == "load":
+                    print(f"🧠 [{os.getpid()}] Loading model: {os.path.basename(payload)}")
+                    model = None
+                    model = YOLO(payload, task="segment")
+                    results.put(("ok", None))
+                    continue
+
+                if model is None:
+                    raise RuntimeError("no model loaded")
+                results.put(("ok", _detect(model, shm, slot_bytes, payload)))
+
+            except Exception as e:
+                if kind == "load":
+                    print(f"❌ [{os.getpid()}] Failed to load model: {e}")
+                results.put(("error", str(e)))
+    finally:
+        shm.close()
+
+
+def _detect(model, shm, slot_bytes, entries):
+    # Frames are views into the ring (no copy); they and the raw results (which
+    # reference them) go out of scope here, before the buffer may be closed
+    frames = [
+        np.ndarray(shape, np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+        for slot, shape in entries
+    ]
+    if TILE_SIZE:
+        return TiledInference.detect(model, frames)
+    output = model(frames, imgsz=640, conf=0.4, verbose=False)
+    return [Detections.from_results(r) for r in output]
@@ -0,0 +1,64 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+
+class JobManager:
+    """
+    In-process background jobs with pollable progress.
+    A job is a coroutine function work(job) that updates job["progress"] and
+    returns its result. Jobs are looked up by id via GET /api/jobs/{job_id}.
+    """
+
+    jobs = {}
+    _tasks = {}
+    MAX_FINISHED = 50  # finished jobs kept for polling
+
+    @staticmethod
+    def submit(kind: str, work):
+        """Start work(job) in the background and return the job record right away"""
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "running",
+            "progress": {"done": 0, "total": None},
+            "result": None,
+            "error": None,
+            "created_at": datetime.now().isoformat(),
+            "finished_at": None
+        }
+        JobManager.jobs[job["id"]] = job
+        JobManager._tasks[job["id"]] = asyncio.create_task(JobManager._run(job, work))
+        print(f"🧾 Job {job['id']} started ({kind})")
+        return job
+
+    @staticmethod
+    def get(job_id: str):
+        return JobManager.jobs.get(job_id)
+
+    @staticmethod
+    def set_progress(job, done, total=None):
+        job["progress"]["done"] = done
+        if total is not None:
+            job["progress"]["total"] = total
+
+    @staticmethod
+    async def _run(job, work):
+        try:
+            job["result"] = await work(job)
+            job["status"] = "done"
+            print(f"✅ Job {job['id']} done ({job['kind']})")
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            print(f"❌ Job {job['id']} failed ({job['kind']}): {e}")
+        finally:
+            job["finished_at"] = datetime.now().isoformat()
+            JobManager._tasks.pop(job["id"], None)
+            JobManager._prune()
+
+    @staticmethod
+    def _prune():
+        finished = [j for j in JobManager.jobs.values() if j["finished_at"]]
+        for job in finished[:-JobManager.MAX_FINISHED]:
+            JobManager.jobs.pop(job["id"], None)
@@ -0,0 +1,44 @@
+import cv2
+from app.core.config import JPEG_ENCODER
+
+try:
+    from turbojpeg import TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+
+class JpegEncoder:
+    """
+    JPEG encoding for the video stream.
+    Uses libjpeg-turbo through PyTurboJPEG when it is installed (JPEG_ENCODER=auto
+    or turbojpeg), otherwise falls back to cv2.imencode. Both take BGR frames
+    and release the GIL, so render workers encode in parallel.
+    """
+
+    backend = "cv2"
+    _turbo = None
+
+    @staticmethod
+    def encode(image, quality) -> bytes:
+        if JpegEncoder._turbo is not None:
+            return JpegEncoder._turbo.encode(image, quality=quality)
+        _, buffer = cv2.imencode(".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        return buffer.tobytes()
+
+    @staticmethod
+    def _init():
+        if JPEG_ENCODER == "cv2":
+            return
+        if TurboJPEG is None:
+            if JPEG_ENCODER == "turbojpeg":
+                print("⚠️ JPEG_ENCODER=turbojpeg but PyTurboJPEG is not installed, using cv2")
+            return
+        try:
+            JpegEncoder._turbo = TurboJPEG()
+            JpegEncoder.backend = "turbojpeg"
+        except Exception as e:
+            # PyTurboJPEG is installed but libturbojpeg was not found
+            print(f"⚠️ libjpeg-turbo unavailable, using cv2: {e}")
+
+
+JpegEncoder._init()
@@ -0,0 +1,74 @@
+import struct
+import cv2
+import numpy as np
+
+
+class MaskOverlay:
+    """
+    Detections as vector data for client-side drawing (/ws/camera?mode=overlay).
+    Mask polygons are simplified and quantized to integer pixels of the sent
+    JPEG, so the overlay costs a few hundred bytes instead of a server-side
+    plot of every mask. Wire layout (little-endian, all u16):
+
+        width, height                       coordinate space (= JPEG size)
+        box_count, box_count x (x1, y1, x2, y2)
+        polygon_count, per polygon: point_count, point_count x (x, y)
+    """
+
+    COLOR = (255, 56, 56)
+    ALPHA = 0.4
+
+    @staticmethod
+    def from_results(results):
+        """(polygons, boxes) of a YOLO result (or Detections) in frame pixels"""
+        if hasattr(results, "polygons"):
+            return results.polygons, results.boxes
+        if results.masks is None:
+            return [], np.zeros((0, 4), np.float32)
+        polygons = [np.asarray(p, dtype=np.float32) for p in results.masks.xy]
+        boxes = results.boxes.xyxy.cpu().numpy().astype(np.float32)
+        return polygons, boxes
+
+    @staticmethod
+    def pack(polygons, boxes, frame_size, out_size, epsilon=1.5) -> bytes:
+        """
+        Scale (polygons, boxes) from frame_size to out_size (w, h), simplify each
+        polygon to within epsilon output pixels and pack them.
+        """
+        sx = out_size[0] / frame_size[0]
+        sy = out_size[1] / frame_size[1]
+        scale = np.array([sx, sy, sx, sy], np.float32)
+        limit = np.array([out_size[0] - 1, out_size[1] - 1] * 2, np.float32)
+
+        parts = [struct.pack("<HHH", out_size[0], out_size[1], len(boxes))]
+        if len(boxes):
+            quantized = np.clip(np.rint(boxes * scale), 0, limit).astype("<u2")
+            parts.append(quantized.tobytes())
+
+        packed = []
+        for polygon in polygons:
+            if len(polygon) < 3:
+                continue
+            points = np.rint(polygon * scale[:2]).astype(np.int32).reshape(-1, 1, 2)
+            points = cv2.approxPolyDP(points, epsilon, True).reshape(-1, 2)
+            if len(points) < 3:
+                continue
+            points = np.clip(points, 0, limit[:2]).astype("<u2")
+            packed.append(struct.pack("<H", len(points)) + points.tobytes())
+
+        parts.append(struct.pack("<H", len(packed)))
+        parts.extend(packed)
+        return b"".join(parts)
+
+    @staticmethod
+    def draw(frame, polygons, boxes):
+        """Burn (polygons, boxes) in frame pixels into a copy of frame (alert snapshots)"""
+        overlay = frame.copy()
+        points = [p.astype(np.int32) for p in polygons if len(p)]
+        if points:
+            cv2.fillPoly(overlay, points, MaskOverlay.COLOR)
+        annotated = cv2.addWeighted(overlay, MaskOverlay.ALPHA, frame, 1 - MaskOverlay.ALPHA, 0)
+
+        for x1, y1, x2, y2 in np.asarray(boxes).astype(np.int32):
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), MaskOverlay.COLOR, 2)
+        return annotated
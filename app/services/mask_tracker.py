@@ -0,0 +1,80 @@
+import cv2
+import numpy as np
+from app.services.mask_overlay import MaskOverlay
+
+
+class MaskTracker:
+    """
+    Keyframe mode for the live stream.
+    YOLO runs only on keyframes (every N frames, or sooner when the scene moves).
+    In between, each detection's mask polygon and box are carried forward with
+    sparse optical flow and drawn onto the fresh camera frame, so the video
+    stays smooth while the stats come from the last keyframe.
+    """
+
+    FLOW_SIZE = (320, 240)  # frames are downscaled to this before flow / motion checks
+
+    def __init__(self, keyframe_interval, motion_threshold):
+        self.keyframe_interval = keyframe_interval
+        self.motion_threshold = motion_threshold
+
+        self.polygons = []                          # per detection (K, 2) float32, frame pixels
+        self.boxes = np.zeros((0, 4), np.float32)   # per detection x1, y1, x2, y2
+        self.stats = None                           # stats of the last keyframe
+
+        self._gray = None
+        self._prev_gray = None
+        self._key_gray = None
+        self._scale = (1.0, 1.0)
+        self._since_keyframe = 0
+
+    def prepare(self, frame):
+        """Register the newest camera frame (call once per frame, before anything else)"""
+        h, w = frame.shape[:2]
+        self._scale = (w / self.FLOW_SIZE[0], h / self.FLOW_SIZE[1])
+        self._prev_gray = self._gray
+        self._gray = cv2.cvtColor(cv2.resize(frame, self.FLOW_SIZE), cv2.COLOR_BGR2GRAY)
+
+    def needs_keyframe(self) -> bool:
+        """True when the current frame should go through YOLO"""
+        if self.stats is None or self._key_gray is None:
+            return True
+        if self._since_keyframe + 1 >= self.keyframe_interval:
+            return True
+
+        # Scene changed too much since the last keyframe to trust the tracker
+        motion = float(cv2.absdiff(self._gray, self._key_gray).mean())
+        return motion > self.motion_threshold
+
+    def set_keyframe(self, results, stats):
+        """Replace tracked detections with a fresh YOLO result"""
+        self.polygons, self.boxes = MaskOverlay.from_results(results)
+
+        self.stats = stats
+        self._key_gray = self._gray
+        self._since_keyframe = 0
+
+    def track(self):
+        """Move the tracked detections along the optical flow since the previous frame"""
+        self._since_keyframe += 1
+        if not len(self.boxes) or self._prev_gray is None:
+            return
+
+        sx, sy = self._scale
+        centers = np.stack([
+            (self.boxes[:, 0] + self.boxes[:, 2]) / 2 / sx,
+            (self.boxes[:, 1] + self.boxes[:, 3]) / 2 / sy
+        ], axis=1).astype(np.float32).reshape(-1, 1, 2)
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, self._gray, centers, None,
+            winSize=(15, 15), maxLevel=2
+        )
+
+        # Detections whose point was lost keep their last position
+        delta = (moved - centers).reshape(-1, 2) * np.array([sx, sy], np.float32)
+        delta[status.reshape(-1) == 0] = 0
+
+        self.boxes += np.hstack([delta, delta])
+        for polygon, (dx, dy) in zip(self.polygons, delta):
+            polygon += (dx, dy)
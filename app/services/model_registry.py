@@ -0,0 +1,141 @@
+import threading
+from pathlib import Path
+from app.core.config import (
+    MODELS_DIR, LIVE_MODEL, NOTIFY_MODEL, INFERENCE_BACKEND, INFERENCE_INT8, INFERENCE_PROCESSES
+)
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of YOLO models.
+    Services ask for a model by role ("live", "notify"). Each weights file is
+    loaded once and shared by every role that points at it.
+
+    With INFERENCE_BACKEND=onnx / openvino, .pt weights are swapped for their
+    exported counterpart (see app/yolo/scripts/export-models.py) when it exists.
+    """
+
+    BACKENDS = ("pytorch", "onnx", "openvino")
+
+    _lock = threading.Lock()
+    _models = {}   # resolved weights path -> loaded model
+    _roles = {}    # role -> resolved weights path
+
+    @staticmethod
+    def export_path(pt_path: Path, backend: str, int8=False) -> Path:
+        """Where the exported copy of a .pt model lives for a backend"""
+        suffix = "_int8" if int8 else ""
+        if backend == "onnx":
+            return pt_path.with_name(f"{pt_path.stem}{suffix}.onnx")
+        if backend == "openvino":
+            return pt_path.with_name(f"{pt_path.stem}{suffix}_openvino_model")
+        return pt_path
+
+    @staticmethod
+    def resolve(weights, backend=INFERENCE_BACKEND, int8=INFERENCE_INT8) -> Path:
+        """Turn a weights file name (or absolute path) into a resolved path for the backend"""
+        path = Path(weights)
+        if not path.is_absolute():
+            path = MODELS_DIR / path
+        path = path.resolve()
+
+        if path.suffix != ".pt" or backend == "pytorch":
+            return path
+
+        exported = ModelRegistry.export_path(path, backend, int8)
+        if not exported.exists():
+            print(f"⚠️ No {backend} export for {path.name} ({exported.name}), using PyTorch weights")
+            return path
+        return exported
+
+    @staticmethod
+    def _load(path: Path):
+        model = ModelRegistry._models.get(path)
+        if model is not None:
+            return model
+
+        with ModelRegistry._lock:
+            # Another thread may have finished loading while we waited
+            model = ModelRegistry._models.get(path)
+            if model is None:
+                from ultralytics import YOLO
+
+                print(f"🧠 Loading model: {path.name}")
+                # Exported models carry no task metadata guarantee - set it explicitly
+                model = YOLO(str(path), task="segment")
+                ModelRegistry._models[path] = model
+                print(f"✅ Model ready: {path.name}")
+            return model
+
+    @staticmethod
+    def get(role: str):
+        """Return the model for a role, loading it on first use"""
+        path = ModelRegistry._roles[role]
+        model = ModelRegistry._models.get(path)
+        if model is None:
+            model = ModelRegistry._load(path)
+        return model
+
+    @staticmethod
+    def path(role: str) -> Path:
+        """Resolved weights path a role currently points at"""
+        return ModelRegistry._roles[role]
+
+    @staticmethod
+    def warm_up(*roles):
+        """Load the given roles' models (all roles when none given) on a background thread"""
+        def load_all():
+            for role in roles or list(ModelRegistry._roles):
+                path = ModelRegistry._roles[role]
+                try:
+                    ModelRegistry._load(path)
+                except Exception as e:
+                    print(f"⚠️ Failed to warm up '{role}' model ({path.name}): {e}")
+
+        threading.Thread(target=load_all, name="model-warmup", daemon=True).start()
+
+    @staticmethod
+    def swap(role: str, weights: str):
+        """
+        Point a role at a different weights file without restarting.
+        The new model is fully loaded before the switch, so inference
+        keeps using the old one until then. With INFERENCE_PROCESSES the
+        inference processes load it themselves on their next batch (see
+        InferenceProcess.detect), so this process only repoints the role.
+        """
+        if role not in ModelRegistry._roles:
+            raise KeyError(f"Unknown model role: {role}")
+
+        path = ModelRegistry.resolve(weights)
+        if not path.exists():
+            raise FileNotFoundError(f"Weights not found: {path.name}")
+
+        if not INFERENCE_PROCESSES:
+            ModelRegistry._load(path)
+        old_path = ModelRegistry._roles[role]
+        ModelRegistry._roles[role] = path
+
+        # Free the old model if no other role still uses it
+        if old_path != path and old_path not in ModelRegistry._roles.values():
+            with ModelRegistry._lock:
+                ModelRegistry._models.pop(old_path, None)
+
+        print(f"🔁 Model '{role}' swapped: {old_path.name} -> {path.name}")
+        return ModelRegistry.status()
+
+    @staticmethod
+    def status():
+        """Summary of roles and which weights are loaded"""
+        return {
+            role: {
+                "weights": path.name,
+                "loaded": path in ModelRegistry._models
+            }
+            for role, path in ModelRegistry._roles.items()
+        }
+
+
+ModelRegistry._roles = {
+    "live": ModelRegistry.resolve(LIVE_MODEL),
+    "notify": ModelRegistry.resolve(NOTIFY_MODEL),
+}
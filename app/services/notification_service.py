@@ -1,135 +1,187 @@
 import asyncio
 import json
+import time
 from datetime import datetime, timedelta
 from app.repositories.previous_notification_dao import PreviousNotificationDAO
 from app.repositories.saved_images_dao import SavedImagesDAO
 from app.services.image_service import ImageService
-import cv2
-import numpy as np
-from ultralytics import YOLO
-from pathlib import Path
+from app.services.camera_live_stream import LiveStreamService
+from app.services.camera_pipeline import CameraPipeline
+from app.core.supabase_client import run_supabase
+from app.core.metrics import Metrics
+from app.core.config import CLIENT_STALL_TIMEOUT
 
 class NotificationService:
-    camera_cap = cv2.VideoCapture(0)
-    
-    # Load YOLO model
-    BASE_DIR = Path(__file__).resolve().parents[1]
-    MODEL_PATH = BASE_DIR / "yolo" / "models" / "trained" / "segmentv3.pt"
-    model = YOLO(str(MODEL_PATH))
-    
-    # Constants
-    ROI_AREA_CM2 = 413
-    AVG_WORM_AREA = 386
-    DENSITY_THRESHOLD = 1.25  # larvae per cm²
-    
-    # Tracking
-    last_notification_time = None
+    # Connected /ws/notify clients - every alert is sent to all of them
+    subscribers = set()
+
+    # One monitor task per camera, started in app startup
+    monitor_tasks = {}
+    CHECK_INTERVAL = 30  # seconds
+
+    # Tracking (per camera)
+    last_notification_times = {}
     NOTIFICATION_COOLDOWN = timedelta(minutes=30)
 
     @staticmethod
-    def check_larvae_density():
-        """Check current larvae density using YOLO"""
-        ret, frame = NotificationService.camera_cap.read()
-        if not ret:
+    def check_larvae_density(camera_id=None, detection=None):
+        """
+        Current larvae density of a camera, taken from the live pipeline's
+        latest detection (no extra camera read or inference).
+        """
+        if detection is None:
+            detection = LiveStreamService.get_pipeline(camera_id).last_detection
+        stats = detection[0]
+
+        if not stats["timestamp"]:
+            # Pipeline has not processed a frame yet
             return False, 0, 0
-        
-        # Run YOLO inference
-        results = NotificationService.model(frame, imgsz=640, conf=0.4, verbose=False)[0]
-        
-        mask_count = 0
-        total_mask_area = 0
-        
-        if results.masks is not None:
-            masks = results.masks.data.cpu().numpy()
-            
-            for mask in masks:
-                area = np.sum(mask)
-                if area > 50:
-                    mask_count += 1
-                    total_mask_area += area
-            
-            area_est_count = total_mask_area / NotificationService.AVG_WORM_AREA if NotificationService.AVG_WORM_AREA > 0 else 0
-            final_count = int(max(mask_count, area_est_count))
-            larvae_per_cm2 = final_count / NotificationService.ROI_AREA_CM2
-            
-            # Check if HIGH density
-            is_high_density = larvae_per_cm2 > NotificationService.DENSITY_THRESHOLD
-            
-            return is_high_density, larvae_per_cm2, final_count
-        
-        return False, 0, 0
+
+        return stats["is_high_density"], stats["density_cm2"], stats["larvae_count"]
 
     @staticmethod
-    async def send_notification(websocket, title, message, larvae_count=0, density=0):
+    async def send_notification(title, message, camera_id=None, larvae_count=0, density=0, frame=None):
+        """
+        Send one alert to every subscriber, then save it once.
+        frame is the annotated frame of the detection that raised the alert.
+        """
+        pipeline = LiveStreamService.get_pipeline(camera_id)
         notification = {
             "title": title,
             "message": message,
+            "camera_id": pipeline.camera_id,
             "larvae_count": larvae_count,
             "density_per_cm2": round(density, 2),
             "timestamp": datetime.now().isoformat()
         }
 
         notification_json = json.dumps(notification)
-        print(f"📤 Sending notification: {notification_json}")
+        print(f"📤 Sending notification to {len(NotificationService.subscribers)} client(s): {notification_json}")
 
         try:
-            # Send via WebSocket
-            await websocket.send_text(notification_json)
+            # Send via WebSocket to all clients at once
+            await NotificationService.broadcast(notification_json)
 
-            # Save notification to DB
-            PreviousNotificationDAO.save(message)
+            # Save notification to DB (write-behind: batched, buffered while offline)
+            PreviousNotificationDAO.save_later(message)
 
-            # Take snapshot & upload to Supabase Storage
-            snapshot_url = ImageService.capture_and_upload_snapshot(NotificationService.camera_cap)
+            # Encode the alert frame in memory & upload to Supabase Storage (on the Supabase pool)
+            snapshot_url = await run_supabase(ImageService.upload_snapshot, frame, pipeline.camera_id)
             if snapshot_url:
-                SavedImagesDAO.save(snapshot_url)
-            
+                SavedImagesDAO.save_later(snapshot_url)
+
             # Update last notification time
-            NotificationService.last_notification_time = datetime.now()
+            NotificationService.last_notification_times[pipeline.camera_id] = datetime.now()
+            Metrics.inc("worm_notifications_sent_total", camera=pipeline.camera_id)
 
         except Exception as e:
             print(f"❌ Failed to send notification: {e}")
 
     @staticmethod
-    def should_send_notification():
-        """Check if enough time has passed since last notification"""
-        if NotificationService.last_notification_time is None:
+    async def broadcast(text):
+        """Send text to every subscriber, dropping the ones that fail"""
+        websockets = list(NotificationService.subscribers)
+        results = await asyncio.gather(
+            *(NotificationService._send(websocket, text) for websocket in websockets),
+            return_exceptions=True
+        )
+        for websocket, result in zip(websockets, results):
+            if isinstance(result, Exception):
+                NotificationService.subscribers.discard(websocket)
+
+    @staticmethod
+    async def _send(websocket, text):
+        start = time.perf_counter()
+        # A stalled client fails the send and is dropped by broadcast()
+        await asyncio.wait_for(websocket.send_text(text), timeout=CLIENT_STALL_TIMEOUT)
+        Metrics.observe("worm_ws_send_seconds", time.perf_counter() - start, endpoint="/ws/notify")
+
+    @staticmethod
+    def cooldown_remaining(camera_id) -> float:
+        """Seconds until the camera may alert again (0 when it is not cooling down)"""
+        last_time = NotificationService.last_notification_times.get(camera_id)
+        if last_time is None:
+            return 0.0
+        remaining = NotificationService.NOTIFICATION_COOLDOWN - (datetime.now() - last_time)
+        return max(remaining.total_seconds(), 0.0)
+
+    @staticmethod
+    def should_send_notification(camera_id):
+        """Check if enough time has passed since the camera's last notification"""
+        last_time = NotificationService.last_notification_times.get(camera_id)
+        if last_time is None:
             return True
-        
-        time_since_last = datetime.now() - NotificationService.last_notification_time
+
+        time_since_last = datetime.now() - last_time
         return time_since_last >= NotificationService.NOTIFICATION_COOLDOWN
 
     @staticmethod
-    async def start_monitoring(websocket):
-        """Monitor larvae density every 30 seconds, send notification every 30 mins if HIGH"""
-        try:
-            while True:
-                await asyncio.sleep(30)  # Check every 30 seconds
-                
-                # Check current density
-                is_high_density, density, count = NotificationService.check_larvae_density()
-                
+    async def monitor_camera(camera_id):
+        """Check a camera's density every 30 seconds, send notification every 30 mins if HIGH"""
+        while True:
+            await asyncio.sleep(NotificationService.CHECK_INTERVAL)
+
+            try:
+                # Check current density (stats + frame of the same detection)
+                detection = LiveStreamService.get_pipeline(camera_id).last_detection
+                is_high_density, density, count = NotificationService.check_larvae_density(
+                    camera_id, detection
+                )
+
                 if is_high_density:
-                    print(f"⚠️ HIGH DENSITY DETECTED: {density:.2f}/cm² ({count} larvae)")
-                    
+                    print(f"⚠️ [{camera_id}] HIGH DENSITY DETECTED: {density:.2f}/cm² ({count} larvae)")
+
                     # Only send notification if cooldown period has passed
-                    if NotificationService.should_send_notification():
+                    if NotificationService.should_send_notification(camera_id):
                         await NotificationService.send_notification(
-                            websocket,
                             "⚠️ High Larvae Density Alert",
                             f"Overpopulated! Detected {count} larvae ({density:.2f}/cm²)",
+                            camera_id=camera_id,
                             larvae_count=count,
-                            density=density
+                            density=density,
+                            frame=CameraPipeline.annotated_frame(detection)
                         )
                         print(f"✅ Notification sent. Next notification in 30 minutes.")
                     else:
-                        time_remaining = NotificationService.NOTIFICATION_COOLDOWN - (
-                            datetime.now() - NotificationService.last_notification_time
-                        )
-                        minutes_left = int(time_remaining.total_seconds() / 60)
-                        print(f"🕒 HIGH density detected but cooldown active ({minutes_left} min remaining)")
+                        minutes_left = int(NotificationService.cooldown_remaining(camera_id) / 60)
+                        print(f"🕒 [{camera_id}] HIGH density detected but cooldown active ({minutes_left} min remaining)")
                 else:
-                    print(f"✅ Healthy density: {density:.2f}/cm² ({count} larvae)")
-                    
-        except Exception as e:
-            print(f"🛑 Notification monitoring stopped: {e}")
\ No newline at end of file
+                    print(f"✅ [{camera_id}] Healthy density: {density:.2f}/cm² ({count} larvae)")
+
+            except Exception as e:
+                print(f"❌ [{camera_id}] Density check failed: {e}")
+
+    @staticmethod
+    def start_monitors():
+        """Start one density monitor per camera"""
+        for camera_id in LiveStreamService.manager.pipelines:
+            if camera_id not in NotificationService.monitor_tasks:
+                NotificationService.monitor_tasks[camera_id] = asyncio.create_task(
+                    NotificationService.monitor_camera(camera_id)
+                )
+
+    @staticmethod
+    async def stop_monitors():
+        for task in NotificationService.monitor_tasks.values():
+            task.cancel()
+        await asyncio.gather(*NotificationService.monitor_tasks.values(), return_exceptions=True)
+        NotificationService.monitor_tasks.clear()
+        print("🛑 Notification monitoring stopped")
+
+    @staticmethod
+    async def start_monitoring(websocket):
+        """Subscribe a /ws/notify client to alerts until it disconnects"""
+        NotificationService.subscribers.add(websocket)
+        try:
+            while True:
+                # Nothing is expected from the client; this raises on disconnect
+                await websocket.receive_text()
+        finally:
+            NotificationService.subscribers.discard(websocket)
+
+
+@Metrics.collector
+def _cooldown_metrics():
+    for camera_id in LiveStreamService.manager.pipelines:
+        yield "worm_notification_cooldown_seconds", {"camera": camera_id}, \
+            round(NotificationService.cooldown_remaining(camera_id), 1)
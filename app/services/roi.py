@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+from app.services.detections import Detections
+
+
+class RegionOfInterest:
+    """
+    A camera's ROI polygon in frame pixels.
+    Before inference the frame is cropped to the polygon's bounding box and
+    everything outside the polygon is blacked out, so the model only sees the
+    tray. Detections are then mapped back to frame coordinates.
+    """
+
+    def __init__(self, polygon):
+        self.polygon = np.asarray(polygon, dtype=np.int32).reshape(-1, 2)
+        x, y, w, h = cv2.boundingRect(self.polygon)
+        self.bbox = (x, y, x + w, y + h)
+
+        self._mask = np.zeros((h, w), np.uint8)
+        cv2.fillPoly(self._mask, [self.polygon - (x, y)], 255)
+        self._rectangular = bool(self._mask.all())
+
+    def _clipped(self, frame_shape):
+        """
+        Bounding box clipped to the frame, plus the matching part of the mask.
+        None when the polygon lies outside the frame (e.g. the camera resolution
+        changed) - the whole frame is used then.
+        """
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = self.bbox
+        cx0, cy0 = max(x0, 0), max(y0, 0)
+        cx1, cy1 = min(x1, width), min(y1, height)
+        if cx1 <= cx0 or cy1 <= cy0:
+            return None
+        mask = self._mask[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0]
+        return (cx0, cy0, cx1, cy1), mask
+
+    def crop(self, frame):
+        """Model input for a frame: the ROI bounding box, masked to the polygon"""
+        clipped = self._clipped(frame.shape)
+        if clipped is None:
+            return frame
+        (x0, y0, x1, y1), mask = clipped
+        crop = frame[y0:y1, x0:x1]
+        if self._rectangular:
+            return np.ascontiguousarray(crop)
+        return cv2.bitwise_and(crop, crop, mask=mask)
+
+    def to_frame(self, results, frame_shape):
+        """
+        Detections of a cropped frame in full-frame coordinates.
+        Mask areas are rescaled to what the same larvae cover on a full-frame
+        inference (masks come out at the model's input resolution, which a
+        crop magnifies), so AVG_WORM_AREA calibrations stay valid.
+        """
+        clipped = self._clipped(frame_shape)
+        if clipped is None:
+            return results  # inference ran on the whole frame (see crop)
+        if not isinstance(results, Detections):
+            results = Detections.from_results(results)
+
+        (x0, y0, x1, y1), _ = clipped
+        height, width = frame_shape[:2]
+        scale = (max(x1 - x0, y1 - y0) / max(width, height)) ** 2
+
+        offset = np.array([x0, y0], np.float32)
+        return Detections(
+            results.areas * scale,
+            [p + offset for p in results.polygons],
+            results.boxes + np.tile(offset, 2)
+        )
+
+    def outline(self):
+        return self.polygon.tolist()
@@ -0,0 +1,30 @@
+import time
+from contextlib import contextmanager
+from app.core.metrics import Metrics
+
+
+class StageTimer:
+    """
+    Wall-clock timing per stage of the frame path (capture, inference, plot, ...).
+    Every measurement goes to the worm_stage_seconds histogram on /metrics;
+    raw samples are only kept while enabled (the benchmark script turns it on).
+    """
+
+    enabled = False
+    samples = {}  # stage -> [seconds]
+
+    @staticmethod
+    @contextmanager
+    def measure(stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            Metrics.observe("worm_stage_seconds", elapsed, stage=stage)
+            if StageTimer.enabled:
+                StageTimer.samples.setdefault(stage, []).append(elapsed)
+
+    @staticmethod
+    def reset():
+        StageTimer.samples = {}
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from collections import deque
+from app.core.stats_store import StatsStore
+from app.core.config import HISTORY_PATH, HISTORY_FLUSH_INTERVAL
+
+class StatsHistory:
+    """
+    Density history for trend charts.
+    Every stats sample is appended to an in-memory ring buffer per camera;
+    a background task periodically flushes the buffers into local rollups
+    (StatsStore), so nothing is written to Supabase.
+    """
+
+    store = StatsStore(HISTORY_PATH)
+    BUFFER_SIZE = 30 * 300  # ~5 min at 30 FPS per camera, in case flushes stall
+
+    buffers = {}
+    _task = None
+
+    @staticmethod
+    def record(camera_id, stats):
+        """Append one stats sample (called by the camera pipeline every frame)"""
+        buffer = StatsHistory.buffers.get(camera_id)
+        if buffer is None:
+            buffer = StatsHistory.buffers[camera_id] = deque(maxlen=StatsHistory.BUFFER_SIZE)
+        buffer.append((time.time(), stats["larvae_count"], stats["density_cm2"]))
+
+    @staticmethod
+    def flush():
+        """Move buffered samples into the rollup store (blocking)"""
+        for camera_id, buffer in list(StatsHistory.buffers.items()):
+            samples = []
+            while buffer:
+                samples.append(buffer.popleft())
+            StatsHistory.store.add_samples(camera_id, samples)
+        StatsHistory.store.prune(time.time())
+
+    @staticmethod
+    def query(camera_id, resolution, since, until, limit):
+        return StatsHistory.store.query(
+            camera_id, StatsStore.RESOLUTIONS[resolution], since, until, limit
+        )
+
+    @staticmethod
+    def start():
+        if StatsHistory._task is None:
+            StatsHistory._task = asyncio.create_task(StatsHistory._run())
+
+    @staticmethod
+    async def stop():
+        if StatsHistory._task is None:
+            return
+        StatsHistory._task.cancel()
+        try:
+            await StatsHistory._task
+        except asyncio.CancelledError:
+            pass
+        StatsHistory._task = None
+
+        # Keep what is still buffered
+        await asyncio.get_running_loop().run_in_executor(None, StatsHistory.flush)
+
+    @staticmethod
+    async def _run():
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(HISTORY_FLUSH_INTERVAL)
+            try:
+                await loop.run_in_executor(None, StatsHistory.flush)
+            except Exception as e:
+                print(f"⚠️ Failed to flush stats history: {e}")
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+
+class StatsSubscription:
+    """
+    One stats subscriber. Holds only the newest payload; next() waits for a change,
+    optionally coalescing bursts (coalesce seconds) and rate limiting (min_interval seconds).
+    """
+
+    def __init__(self, min_interval=0.0, coalesce=0.0):
+        self.min_interval = min_interval
+        self.coalesce = coalesce
+        self._payload = None
+        self._event = asyncio.Event()
+        self._last_sent = 0.0
+
+    def push(self, payload):
+        self._payload = payload
+        self._event.set()
+
+    async def next(self) -> str:
+        await self._event.wait()
+        loop = asyncio.get_running_loop()
+
+        if self.coalesce:
+            # Let a burst of changes settle, then send only the newest
+            await asyncio.sleep(self.coalesce)
+
+        wait = self._last_sent + self.min_interval - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        self._event.clear()
+        self._last_sent = loop.time()
+        return self._payload
+
+
+class StatsHub:
+    """
+    Pub/sub for a camera's live stats.
+    The pipeline publishes after every frame, but subscribers are only woken
+    when the values actually change, and the JSON is serialized once per change
+    for all of them.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.publishes = 0
+        self._last_values = None
+        self._last_payload = None
+
+    def publish(self, stats):
+        values = {k: v for k, v in stats.items() if k != "timestamp"}
+        if values == self._last_values:
+            return
+
+        self._last_values = values
+        self._last_payload = json.dumps(stats)
+        self.publishes += 1
+        for subscription in list(self.subscribers):
+            subscription.push(self._last_payload)
+
+    def subscribe(self, min_interval=0.0, coalesce=0.0) -> StatsSubscription:
+        subscription = StatsSubscription(min_interval, coalesce)
+        if self._last_payload is not None:
+            # New subscribers get the current state right away
+            subscription.push(self._last_payload)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
@@ -0,0 +1,149 @@
+import cv2
+import numpy as np
+from app.services.detections import Detections
+from app.core.config import TILE_SIZE, TILE_OVERLAP, TILE_MERGE_OVERLAP
+
+
+class TiledInference:
+    """
+    High-resolution inference for small larvae.
+    Every frame is split into overlapping square tiles and the tiles of all
+    frames go through the model in one batched call, each at the normal
+    imgsz - so a 1280x720 frame is seen at (close to) native resolution
+    instead of being downsampled to 640. Detections are shifted back to frame
+    coordinates and duplicates along tile seams are merged by mask overlap.
+    """
+
+    IMGSZ = 640  # model input size, as in the untiled path (exports are fixed to it)
+
+    @staticmethod
+    def _starts(length, tile, stride):
+        if length <= tile:
+            return [0]
+        starts = list(range(0, length - tile, stride))
+        starts.append(length - tile)
+        return starts
+
+    @staticmethod
+    def tiles(frame_shape, tile=TILE_SIZE, overlap=TILE_OVERLAP):
+        """(x0, y0, x1, y1) of the tiles covering a frame, neighbours sharing `overlap` of a tile"""
+        height, width = frame_shape[:2]
+        stride = max(1, int(tile * (1 - overlap)))
+        return [
+            (x0, y0, min(x0 + tile, width), min(y0 + tile, height))
+            for y0 in TiledInference._starts(height, tile, stride)
+            for x0 in TiledInference._starts(width, tile, stride)
+        ]
+
+    @staticmethod
+    def detect(model, frames, tile=TILE_SIZE, overlap=TILE_OVERLAP, merge_overlap=TILE_MERGE_OVERLAP):
+        """Tiled detection of frames with one batched model call. Returns one Detections per frame."""
+        layouts = [TiledInference.tiles(frame.shape, tile, overlap) for frame in frames]
+        crops = [
+            frame[y0:y1, x0:x1]
+            for frame, layout in zip(frames, layouts)
+            for x0, y0, x1, y1 in layout
+        ]
+        output = iter(model(crops, imgsz=TiledInference.IMGSZ, conf=0.4, verbose=False))
+
+        detections = []
+        for frame, layout in zip(frames, layouts):
+            height, width = frame.shape[:2]
+            areas, polygons, boxes, tile_ids = [], [], [], []
+            for tile_id, (x0, y0, x1, y1) in enumerate(layout):
+                found = Detections.from_results(next(output))
+                offset = np.array([x0, y0], np.float32)
+                # Masks come out at imgsz for the tile; rescale to what an
+                # untiled pass over the whole frame measures (AVG_WORM_AREA)
+                scale = (max(x1 - x0, y1 - y0) / max(width, height)) ** 2
+                areas.append(found.areas * scale)
+                polygons.extend(p + offset for p in found.polygons)
+                boxes.append(found.boxes + np.tile(offset, 2))
+                tile_ids.extend([tile_id] * len(found.areas))
+
+            areas = np.concatenate(areas).astype(np.float32)
+            boxes = np.concatenate(boxes).astype(np.float32).reshape(-1, 4)
+            if len(layout) > 1:
+                keep = TiledInference.merge(areas, polygons, boxes, tile_ids, layout, merge_overlap)
+            else:
+                keep = list(range(len(areas)))
+            detections.append(Detections(areas[keep], [polygons[i] for i in keep], boxes[keep]))
+        return detections
+
+    @staticmethod
+    def _band(a, b):
+        """Region shared by two tiles (x0, y0, x1, y1), or None"""
+        x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+        x1, y1 = min(a[2], b[2]), min(a[3], b[3])
+        return (x0, y0, x1, y1) if x0 < x1 and y0 < y1 else None
+
+    @staticmethod
+    def _touches(box, region):
+        return box[0] < region[2] and box[2] > region[0] and box[1] < region[3] and box[3] > region[1]
+
+    @staticmethod
+    def merge(areas, polygons, boxes, tile_ids, layout, threshold):
+        """
+        Indexes of the detections to keep after seam de-duplication.
+        Only detections of different tiles that both reach into the band the
+        two tiles share are compared - detections of one tile were already
+        de-duplicated by the model's NMS, and overlapping larvae there are
+        real. Larger masks win (a larva cut by a tile edge yields a partial
+        mask next to the complete one from the neighbouring tile); a detection
+        is dropped when its mask overlaps a kept one by more than threshold,
+        measured as intersection over the smaller mask.
+        """
+        bands = {
+            (a, b): TiledInference._band(layout[a], layout[b])
+            for a in range(len(layout)) for b in range(len(layout)) if a != b
+        }
+        # Detections away from every shared band cannot be seam duplicates
+        in_band = [
+            any(
+                band is not None and a == tile_ids[i] and TiledInference._touches(boxes[i], band)
+                for (a, _), band in bands.items()
+            )
+            for i in range(len(areas))
+        ]
+
+        kept = [i for i in range(len(areas)) if not in_band[i]]
+        kept_in_band = []
+        for i in np.argsort(-areas, kind="stable"):
+            if not in_band[i]:
+                continue
+            duplicate = False
+            for j in kept_in_band:
+                band = bands.get((tile_ids[i], tile_ids[j]))
+                if band is None or not (
+                    TiledInference._touches(boxes[i], band) and TiledInference._touches(boxes[j], band)
+                ):
+                    continue  # same tile, or tiles that do not overlap
+                if TiledInference._overlap(polygons[i], boxes[i], polygons[j], boxes[j]) > threshold:
+                    duplicate = True
+                    break
+            if not duplicate:
+                kept_in_band.append(i)
+        return sorted(kept + kept_in_band)
+
+    @staticmethod
+    def _overlap(polygon_a, box_a, polygon_b, box_b):
+        """Intersection over the smaller of two masks, rasterized around their boxes"""
+        if min(box_a[2], box_b[2]) <= max(box_a[0], box_b[0]) or min(box_a[3], box_b[3]) <= max(box_a[1], box_b[1]):
+            return 0.0  # boxes do not touch
+        x0, y0 = np.floor(np.minimum(box_a[:2], box_b[:2])).astype(int)
+        x1, y1 = np.ceil(np.maximum(box_a[2:], box_b[2:])).astype(int)
+
+        masks = []
+        for polygon, box in ((polygon_a, box_a), (polygon_b, box_b)):
+            mask = np.zeros((y1 - y0 + 1, x1 - x0 + 1), np.uint8)
+            if len(polygon) >= 3:
+                cv2.fillPoly(mask, [np.rint(polygon - (x0, y0)).astype(np.int32)], 1)
+            else:
+                bx0, by0, bx1, by1 = np.rint(box - (x0, y0, x0, y0)).astype(int)
+                mask[by0:by1 + 1, bx0:bx1 + 1] = 1
+            masks.append(mask.astype(bool))
+
+        smaller = min(masks[0].sum(), masks[1].sum())
+        if smaller == 0:
+            return 0.0
+        return float(np.logical_and(masks[0], masks[1]).sum()) / smaller
@@ -0,0 +1,79 @@
+"""
+Headless batch analysis of recorded tray footage.
+
+    python app/yolo/scripts/batch-analyze.py recordings/ --output counts.csv
+    python app/yolo/scripts/batch-analyze.py week1/ week2/ --output counts.parquet --every 30
+
+Takes image / video files or folders of them, runs them through the model
+in batches on a pool of inference processes while the next frames are
+decoded, and writes per-frame larva counts and densities to CSV or Parquet.
+Progress is checkpointed next to the output: rerunning the same command
+after a crash (or after adding recordings) continues where it stopped.
+Use --restart to rerun from scratch, e.g. after swapping the model.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+sys.path.insert(0, str(BASE_DIR.parents[1]))
+from app.core.config import ANALYSIS_BATCH_SIZE, ANALYSIS_WORKERS
+from app.services.batch_analyzer import BatchAnalyzer
+from app.services.larva_metrics import LarvaMetrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count larvae in image folders and video archives")
+    parser.add_argument("inputs", nargs="+", help="Image / video files or folders (searched recursively)")
+    parser.add_argument("--output", required=True, help="Output .csv file or .parquet dataset directory")
+    parser.add_argument("--format", choices=("csv", "parquet"), default=None, help="Default: from the output suffix")
+    parser.add_argument("--every", type=int, default=1, help="Analyze every Nth video frame")
+    parser.add_argument("--batch-size", type=int, default=ANALYSIS_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=ANALYSIS_WORKERS,
+                        help="Inference processes (0 = run the model in this process)")
+    parser.add_argument("--role", default="live",
+                        help="Model role whose weights are used (live = what the dashboard counts with)")
+    parser.add_argument("--roi-area-cm2", type=float, default=LarvaMetrics.ROI_AREA_CM2)
+    parser.add_argument("--avg-worm-area", type=float, default=LarvaMetrics.AVG_WORM_AREA)
+    parser.add_argument("--density-threshold", type=float, default=LarvaMetrics.DENSITY_THRESHOLD)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    try:
+        analyzer = BatchAnalyzer(
+            args.inputs, args.output, fmt=args.format, role=args.role,
+            batch_size=args.batch_size, workers=args.workers, frame_step=args.every,
+            roi_area_cm2=args.roi_area_cm2, avg_worm_area=args.avg_worm_area,
+            density_threshold=args.density_threshold
+        )
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if not analyzer.sources:
+        print("❌ No images or videos found")
+        sys.exit(1)
+
+    last_report = [0.0]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if now - last_report[0] >= 5:
+            last_report[0] = now
+            percent = f" ({100 * done / total:.1f}%)" if total else ""
+            print(f"⏳ {done}/{total} frames{percent}")
+
+    try:
+        analyzer.run(resume=not args.restart, progress=progress)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted - rerun the same command to resume from the last checkpoint")
+        sys.exit(130)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
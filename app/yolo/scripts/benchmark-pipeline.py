@@ -0,0 +1,122 @@
+"""
+Stage-level benchmark of the live frame path.
+
+    python app/yolo/scripts/benchmark-pipeline.py
+    python app/yolo/scripts/benchmark-pipeline.py --frames 500 --camera default
+
+Replays the bundled worm video through LiveStreamService.capture_frame (the
+same decode -> inference -> mask stats -> plot -> resize -> JPEG code the live
+pipeline runs), then base64-encodes every frame like the text websocket does.
+Per-stage latency percentiles and throughput are written as JSON to
+app/yolo/reports/ so runs can be diffed against each other.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+REPORTS_DIR = BASE_DIR / "reports"
+
+sys.path.insert(0, str(BASE_DIR.parents[1]))
+from app.core.config import INFERENCE_BACKEND, INFERENCE_INT8, KEYFRAME_INTERVAL, DEFAULT_RENDITION
+from app.services.camera_live_stream import LiveStreamService
+from app.services.model_registry import ModelRegistry
+from app.services.stage_timer import StageTimer
+
+STAGES = ("decode", "inference", "mask_stats", "track", "plot", "resize", "jpeg_encode", "base64")
+
+
+def summarize(samples):
+    ms = np.array(samples, dtype=np.float64) * 1000
+    return {
+        "count": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+        "total_s": round(float(ms.sum()) / 1000, 3)
+    }
+
+
+def replay(cap, camera_id, count):
+    for _ in range(count):
+        with StageTimer.measure("frame"):
+            encoded = LiveStreamService.capture_frame(cap, camera_id, DEFAULT_RENDITION)
+            if encoded is None:
+                raise RuntimeError("Video returned no frames")
+            with StageTimer.measure("base64"):
+                encoded[DEFAULT_RENDITION].as_text()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the live frame path stage by stage")
+    parser.add_argument("--video", default=str(LiveStreamService.VIDEO_PATH))
+    parser.add_argument("--camera", default=None, help="Camera id whose settings are used")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=10, help="Frames run before measuring")
+    parser.add_argument("--out", default=None, help="Report path (default: reports/benchmark-<time>.json)")
+    args = parser.parse_args()
+
+    if LiveStreamService.get_pipeline(args.camera) is None:
+        print(f"❌ Unknown camera: {args.camera}")
+        sys.exit(1)
+
+    cap = cv2.VideoCapture(args.video)
+    if not cap.isOpened():
+        print(f"❌ Cannot open video file: {args.video}")
+        sys.exit(1)
+
+    print(f"🔥 Warming up ({args.warmup} frames)...")
+    replay(cap, args.camera, args.warmup)
+
+    StageTimer.reset()
+    StageTimer.enabled = True
+    print(f"⏱️ Measuring {args.frames} frames from {Path(args.video).name}...")
+    start = time.perf_counter()
+    replay(cap, args.camera, args.frames)
+    elapsed = time.perf_counter() - start
+    StageTimer.enabled = False
+    cap.release()
+
+    samples = StageTimer.samples
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "video": Path(args.video).name,
+        "camera": LiveStreamService.get_pipeline(args.camera).camera_id,
+        "model": ModelRegistry.status()["live"]["weights"],
+        "backend": INFERENCE_BACKEND,
+        "int8": INFERENCE_INT8,
+        "keyframe_interval": KEYFRAME_INTERVAL,
+        "rendition": DEFAULT_RENDITION,
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__
+        },
+        "frames": args.frames,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(args.frames / elapsed, 2),
+        "frame": summarize(samples["frame"]),
+        "stages": {stage: summarize(samples[stage]) for stage in STAGES if stage in samples}
+    }
+
+    REPORTS_DIR.mkdir(exist_ok=True)
+    out_path = Path(args.out) if args.out else \
+        REPORTS_DIR / f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out_path.write_text(json.dumps(report, indent=2))
+
+    print(json.dumps(report, indent=2))
+    print(f"\n📝 Report written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
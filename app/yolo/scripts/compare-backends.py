@@ -0,0 +1,120 @@
+"""
+Accuracy / throughput report for an exported backend against the PyTorch baseline.
+
+    python app/yolo/scripts/compare-backends.py --backend onnx
+    python app/yolo/scripts/compare-backends.py --backend onnx --int8 --weights segmentv3.pt
+
+Runs the same video frames through both models, counts larvae with the shared
+LarvaMetrics code and writes a JSON report to app/yolo/reports/.
+"""
+import argparse
+import json
+import sys
+import time
+import cv2
+import numpy as np
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+VIDEO_PATH = BASE_DIR / "videos" / "worm-vid.MOV"
+REPORTS_DIR = BASE_DIR / "reports"
+
+sys.path.insert(0, str(BASE_DIR.parents[1]))
+from app.core.config import LIVE_MODEL
+from app.services.model_registry import ModelRegistry
+from app.services.larva_metrics import LarvaMetrics
+
+
+def read_frames(video_path, count, stride):
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Cannot open video file: {video_path}")
+
+    frames = []
+    index = 0
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index % stride == 0:
+            frames.append(frame)
+        index += 1
+    cap.release()
+    return frames
+
+
+def run(model, frames):
+    """Per-frame stats + total inference seconds"""
+    model(frames[0], imgsz=640, conf=0.4, verbose=False)  # warm-up
+    stats = []
+    elapsed = 0.0
+
+    for frame in frames:
+        start = time.perf_counter()
+        results = model(frame, imgsz=640, conf=0.4, verbose=False)[0]
+        elapsed += time.perf_counter() - start
+        stats.append(LarvaMetrics.compute(results))
+
+    return stats, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare an exported backend with PyTorch")
+    parser.add_argument("--backend", choices=["onnx", "openvino"], default="onnx")
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--weights", default=LIVE_MODEL)
+    parser.add_argument("--video", default=str(VIDEO_PATH))
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--stride", type=int, default=5, help="Use every Nth video frame")
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    baseline_path = ModelRegistry.resolve(args.weights, backend="pytorch")
+    candidate_path = ModelRegistry.resolve(args.weights, backend=args.backend, int8=args.int8)
+    if candidate_path == baseline_path:
+        print("❌ No exported model found - run export-models.py first")
+        sys.exit(1)
+
+    frames = read_frames(args.video, args.frames, args.stride)
+    print(f"🎞️ {len(frames)} frames from {Path(args.video).name}")
+
+    base_stats, base_time = run(YOLO(str(baseline_path), task="segment"), frames)
+    cand_stats, cand_time = run(YOLO(str(candidate_path), task="segment"), frames)
+
+    base_counts = np.array([s["larvae_count"] for s in base_stats], dtype=np.float64)
+    cand_counts = np.array([s["larvae_count"] for s in cand_stats], dtype=np.float64)
+    base_density = np.array([s["density_cm2"] for s in base_stats])
+    cand_density = np.array([s["density_cm2"] for s in cand_stats])
+    count_diff = np.abs(cand_counts - base_counts)
+
+    report = {
+        "weights": baseline_path.name,
+        "candidate": candidate_path.name,
+        "backend": args.backend,
+        "int8": args.int8,
+        "frames": len(frames),
+        "baseline_fps": round(len(frames) / base_time, 2),
+        "candidate_fps": round(len(frames) / cand_time, 2),
+        "speedup": round(base_time / cand_time, 2),
+        "mean_count_baseline": round(float(base_counts.mean()), 2),
+        "mean_count_candidate": round(float(cand_counts.mean()), 2),
+        "mean_abs_count_diff": round(float(count_diff.mean()), 2),
+        "max_abs_count_diff": int(count_diff.max()),
+        "mean_rel_count_error": round(float((count_diff / np.maximum(base_counts, 1)).mean()), 4),
+        "mean_abs_density_diff_cm2": round(float(np.abs(cand_density - base_density).mean()), 4),
+        "high_density_agreement": round(float(np.mean(
+            [b["is_high_density"] == c["is_high_density"] for b, c in zip(base_stats, cand_stats)]
+        )), 4)
+    }
+
+    REPORTS_DIR.mkdir(exist_ok=True)
+    out_path = REPORTS_DIR / f"compare-{candidate_path.stem}.json"
+    out_path.write_text(json.dumps(report, indent=2))
+
+    print(json.dumps(report, indent=2))
+    print(f"\n📝 Report written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
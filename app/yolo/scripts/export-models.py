@@ -0,0 +1,167 @@
+"""
+One-time export of the trained .pt models for the CPU inference backends.
+
+    python app/yolo/scripts/export-models.py --format onnx
+    python app/yolo/scripts/export-models.py --format onnx --int8
+    python app/yolo/scripts/export-models.py --format openvino --int8
+
+Then start the server with INFERENCE_BACKEND=onnx (and INFERENCE_INT8=1).
+INT8 calibration frames are sampled evenly from the videos in app/yolo/videos.
+Exports have a dynamic batch dimension: the live pipeline batches one frame
+per camera (or every tile with TILE_SIZE) and the batch analyzer several
+frames per call, so a batch-1 model would reject them.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import cv2
+import numpy as np
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+VIDEOS_DIR = BASE_DIR / "videos"
+VIDEO_SUFFIXES = (".mov", ".mp4", ".avi", ".mkv")
+IMGSZ = 640
+CALIB_BATCH = 4  # calibration batches are multi-frame, like the batches the pipeline sends
+
+sys.path.insert(0, str(BASE_DIR.parents[1]))
+from app.core.config import LIVE_MODEL, NOTIFY_MODEL
+from app.services.model_registry import ModelRegistry
+
+
+def sample_calibration_frames(count):
+    """Evenly spaced BGR frames across every video in app/yolo/videos"""
+    videos = sorted(p for p in VIDEOS_DIR.iterdir() if p.suffix.lower() in VIDEO_SUFFIXES)
+    if not videos:
+        raise FileNotFoundError(f"No calibration videos in {VIDEOS_DIR}")
+
+    per_video = max(1, count // len(videos))
+    frames = []
+
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or per_video
+        for index in np.linspace(0, total - 1, per_video).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ret, frame = cap.read()
+            if ret:
+                frames.append(frame)
+        cap.release()
+
+    print(f"🎞️ {len(frames)} calibration frames from {len(videos)} video(s)")
+    return frames
+
+
+def preprocess(frame, size=IMGSZ):
+    """Letterbox to size x size like ultralytics, as a 1x3xHxW float32 RGB tensor (stack for batches)"""
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    canvas = np.full((size, size, 3), 114, np.uint8)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh))
+
+    rgb = canvas[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(rgb, dtype=np.float32)[None] / 255.0
+
+
+def export_onnx(pt_path, int8, frames):
+    from ultralytics import YOLO
+
+    target = ModelRegistry.export_path(pt_path, "onnx")
+    exported = Path(YOLO(str(pt_path)).export(format="onnx", imgsz=IMGSZ, simplify=True, dynamic=True))
+    if exported != target:
+        shutil.move(str(exported), str(target))
+    print(f"✅ ONNX export: {target.name}")
+
+    if not int8:
+        return target
+
+    import onnxruntime
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    )
+
+    input_name = onnxruntime.InferenceSession(
+        str(target), providers=["CPUExecutionProvider"]
+    ).get_inputs()[0].name
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._batches = iter([
+                {input_name: np.concatenate([preprocess(f) for f in frames[i:i + CALIB_BATCH]])}
+                for i in range(0, len(frames), CALIB_BATCH)
+            ])
+
+        def get_next(self):
+            return next(self._batches, None)
+
+    int8_target = ModelRegistry.export_path(pt_path, "onnx", int8=True)
+    quantize_static(
+        str(target),
+        str(int8_target),
+        FrameReader(),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8
+    )
+    print(f"✅ ONNX INT8 export: {int8_target.name}")
+    return int8_target
+
+
+def export_openvino(pt_path, int8, frames):
+    from ultralytics import YOLO
+
+    model = YOLO(str(pt_path))
+    options = {"format": "openvino", "imgsz": IMGSZ, "dynamic": True}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if int8:
+            # Ultralytics calibrates OpenVINO INT8 from a dataset yaml - build one from the frames
+            images = Path(tmp) / "images" / "val"
+            images.mkdir(parents=True)
+            for i, frame in enumerate(frames):
+                cv2.imwrite(str(images / f"calib_{i:04d}.jpg"), frame)
+
+            names = "\n".join(f"  {k}: {v}" for k, v in model.names.items())
+            data_yaml = Path(tmp) / "calib.yaml"
+            data_yaml.write_text(
+                f"path: {tmp}\ntrain: images/val\nval: images/val\nnames:\n{names}\n"
+            )
+            options.update(int8=True, data=str(data_yaml), batch=CALIB_BATCH)
+
+        exported = Path(model.export(**options))
+
+    target = ModelRegistry.export_path(pt_path, "openvino", int8)
+    if exported != target:
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.move(str(exported), str(target))
+    print(f"✅ OpenVINO{' INT8' if int8 else ''} export: {target.name}")
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export YOLO weights for CPU inference backends")
+    parser.add_argument("--format", choices=["onnx", "openvino"], default="onnx")
+    parser.add_argument("--int8", action="store_true", help="Also build an INT8-quantized model")
+    parser.add_argument("--calib-frames", type=int, default=200)
+    parser.add_argument("--weights", nargs="*", default=[LIVE_MODEL, NOTIFY_MODEL],
+                        help="Weights files to export (default: live + notify models)")
+    args = parser.parse_args()
+
+    frames = sample_calibration_frames(args.calib_frames) if args.int8 else []
+
+    for weights in dict.fromkeys(args.weights):
+        pt_path = ModelRegistry.resolve(weights, backend="pytorch")
+        print(f"\n📦 Exporting {pt_path.name} -> {args.format}")
+        if args.format == "onnx":
+            export_onnx(pt_path, args.int8, frames)
+        else:
+            export_openvino(pt_path, args.int8, frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,30 @@
-from ultralytics import YOLO
+import sys
 import cv2
-import numpy as np
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 
-MODEL_PATH = BASE_DIR / "models" / "trained" / "segmentv3.pt"
+# Share the backend's model registry (same weights as the live stream and its alerts)
+sys.path.insert(0, str(BASE_DIR.parents[1]))
+from app.services.model_registry import ModelRegistry
+from app.services.larva_metrics import LarvaMetrics
+from app.services.mask_overlay import MaskOverlay
+from app.services.tiled_inference import TiledInference
+from app.core.config import TILE_SIZE
 
-model = YOLO(str(MODEL_PATH))
+model = ModelRegistry.get("live")
 
 ROI_AREA_CM2 = 413
 ROI_AREA_M2 = ROI_AREA_CM2 / 10000
 
 AVG_WORM_AREA = 386
 
-cap = cv2.VideoCapture(0)
+# Camera index or stream URL: python live-detection.py [source] (default 0)
+CAMERA_SOURCE = sys.argv[1] if len(sys.argv) > 1 else "0"
+if CAMERA_SOURCE.isdigit():
+    CAMERA_SOURCE = int(CAMERA_SOURCE)
+
+cap = cv2.VideoCapture(CAMERA_SOURCE)
 
 cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280) #adjustable
 cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720) #adjustable
@@ -28,38 +38,29 @@ while True:
     if not ret:
         break
 
-    results = model(frame, imgsz=640, conf=0.4, verbose=False)[0]
-
-    mask_count = 0
-    total_mask_area = 0
-
-    if results.masks is not None:
-        masks = results.masks.data.cpu().numpy()
-
-        for mask in masks:
-            area = np.sum(mask)
-            if area > 50:
-                mask_count += 1
-                total_mask_area += area
+    # TILE_SIZE=640 keeps the 1280x720 capture at native resolution (tiles batched in one call)
+    if TILE_SIZE:
+        results = TiledInference.detect(model, [frame])[0]
+    else:
+        results = model(frame, imgsz=640, conf=0.4, verbose=False)[0]
 
-        area_est_count = total_mask_area / AVG_WORM_AREA if AVG_WORM_AREA > 0 else 0
-        final_count = int(max(mask_count, area_est_count))
+    stats = LarvaMetrics.compute(results, roi_area_cm2=ROI_AREA_CM2, avg_worm_area=AVG_WORM_AREA)
 
-        larvae_per_cm2 = final_count / ROI_AREA_CM2
-        larvae_per_m2 = final_count / ROI_AREA_M2
+    final_count = stats["larvae_count"]
+    larvae_per_cm2 = stats["density_cm2"]
+    larvae_per_m2 = stats["density_m2"]
 
-        if larvae_per_cm2 > 1.25:
+    if len(results.boxes):
+        if stats["is_high_density"]:
             print("Alert!! Larva Density is High ",round(larvae_per_cm2,2), "/cm2" )
         
         else:
             print("Healthy Density")
 
+    if TILE_SIZE:
+        annotated_frame = MaskOverlay.draw(frame, results.polygons, results.boxes)
     else:
-        final_count = 0
-        larvae_per_cm2 = 0
-        larvae_per_m2 = 0
-
-    annotated_frame = results.plot()
+        annotated_frame = results.plot()
 
     cv2.putText(annotated_frame, f"Larvae: {final_count}", (20, 40),
                 cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
@@ -1,15 +1,22 @@
-from ultralytics import YOLO
+import sys
 import cv2
-import numpy as np
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 
-MODEL_PATH = BASE_DIR / "models" / "trained" / "segmentv3.pt"
+# Share the backend's model registry (same weights as the live stream and its alerts)
+sys.path.insert(0, str(BASE_DIR.parents[1]))
+from app.services.model_registry import ModelRegistry
+from app.services.larva_metrics import LarvaMetrics
 
-model = YOLO(str(MODEL_PATH))
+model = ModelRegistry.get("live")
 
-IMAGE_PATH = r"C:\Programming\real-2.jpg"
+# Image to inspect: python yolo-segmentation-img.py <image>
+# (batch-analyze.py counts whole folders headless)
+if len(sys.argv) < 2:
+    print("Usage: python yolo-segmentation-img.py <image>")
+    exit()
+IMAGE_PATH = sys.argv[1]
 
 ROI_AREA_M2 = 0.0413  
 AVG_WORM_AREA = 386  # average worm pixel area (fixed camera height)
@@ -24,39 +31,29 @@ h, w, _ = frame.shape
 
 results = model(frame, imgsz=640, conf=0.4, verbose=False)[0]
 
-mask_count = 0
-total_mask_area = 0
-
-if results.masks is not None:
-    masks = results.masks.data.cpu().numpy()
-
-    for mask in masks:
-        area = np.sum(mask)
-        if area > 50:
-            mask_count += 1
-            total_mask_area += area
-
-    area_est_count = total_mask_area / AVG_WORM_AREA if AVG_WORM_AREA > 0 else 0
-    final_count = int(max(mask_count, area_est_count))
+stats = LarvaMetrics.compute(
+    results,
+    roi_area_cm2=ROI_AREA_M2 * 10000,
+    avg_worm_area=AVG_WORM_AREA
+)
 
-    larvae_per_m2 = final_count / ROI_AREA_M2
-    larvae_per_cm2 = larvae_per_m2 / 10000  # ✅ conversion
+final_count = stats["larvae_count"]
+larvae_per_m2 = stats["density_m2"]
+larvae_per_cm2 = stats["density_cm2"]
 
-    print("Mask count:", mask_count)
-    print("Area estimated count:", round(area_est_count, 2))
+if results.masks is not None:
+    print("Mask count:", stats["mask_count"])
+    print("Area estimated count:", round(stats["area_est_count"], 2))
     print("Estimated Larva Count:", final_count)
     print("Larvae per cm²:", round(larvae_per_cm2, 2))
 
-    if larvae_per_cm2 > 1.25:
+    if stats["is_high_density"]:
         print("Alert!! Larva Density is High ",round(larvae_per_cm2,2), "/cm2" )
     
     else:
         print("Healthy Density")
 
 else:
-    final_count = 0
-    larvae_per_m2 = 0
-    larvae_per_cm2 = 0
     print("No larvae detected")
 
 annotated_frame = results.plot(line_width=2)   
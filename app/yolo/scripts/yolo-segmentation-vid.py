@@ -1,18 +1,19 @@
-from ultralytics import YOLO
+import sys
 import cv2
-import numpy as np
 from pathlib import Path
 
 # Base directory (project root)
 BASE_DIR = Path(__file__).resolve().parents[1]
 
-# Model path (already relative)
-MODEL_PATH = BASE_DIR / "models" / "trained" / "segmentv3.pt"
-
 # ✅ Video path (NOW RELATIVE)
 VIDEO_PATH = BASE_DIR / "videos" / "worm-vid.mov"
 
-model = YOLO(str(MODEL_PATH))
+# Share the backend's model registry (same weights as the live stream and its alerts)
+sys.path.insert(0, str(BASE_DIR.parents[1]))
+from app.services.model_registry import ModelRegistry
+from app.services.larva_metrics import LarvaMetrics
+
+model = ModelRegistry.get("live")
 
 ROI_AREA_CM2 = 413  # 8x8 inches according to the client
 ROI_AREA_M2 = ROI_AREA_CM2 / 10000
@@ -32,34 +33,18 @@ while True:
 
     results = model(frame, imgsz=640, conf=0.4, verbose=False)[0]
 
-    mask_count = 0
-    total_mask_area = 0
-
-    if results.masks is not None:
-        masks = results.masks.data.cpu().numpy()
-
-        for mask in masks:
-            area = np.sum(mask)
-            if area > 50:
-                mask_count += 1
-                total_mask_area += area
-
-        area_est_count = total_mask_area / AVG_WORM_AREA if AVG_WORM_AREA > 0 else 0
-        final_count = int(max(mask_count, area_est_count))
+    stats = LarvaMetrics.compute(results, roi_area_cm2=ROI_AREA_CM2, avg_worm_area=AVG_WORM_AREA)
 
-        larvae_per_cm2 = final_count / ROI_AREA_CM2
-        larvae_per_m2 = final_count / ROI_AREA_M2
+    final_count = stats["larvae_count"]
+    larvae_per_cm2 = stats["density_cm2"]
+    larvae_per_m2 = stats["density_m2"]
 
-        if larvae_per_cm2 > 1.25:
+    if results.masks is not None:
+        if stats["is_high_density"]:
             print("Alert!! Larva Density is High", round(larvae_per_cm2, 2), "/cm2")
         else:
             print("Healthy Density")
 
-    else:
-        final_count = 0
-        larvae_per_cm2 = 0
-        larvae_per_m2 = 0
-
     annotated_frame = results.plot(line_width=1)
 
     font = cv2.FONT_HERSHEY_SIMPLEX
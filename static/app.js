@@ -1,11 +1,21 @@
 let socket = null;
-let statsSocket = null; // NEW: Stats WebSocket
 let notifSocket = null;
 let notificationTimeout = null;
+let frameUrl = null; // Object URL of the frame currently shown
+
+// Binary camera frame header (see app/services/frame_protocol.py)
+const FRAME_HEADER_SIZE = 28;
+const FLAG_HIGH_DENSITY = 0x01;
+const FLAG_OVERLAY = 0x02;
+const OVERLAY_COLOR = "rgba(56, 56, 255, 0.4)"; // server draws BGR (255, 56, 56)
+const OVERLAY_BOX_COLOR = "rgb(56, 56, 255)";
 
 const img = document.getElementById("video");
+const overlayCanvas = document.getElementById("overlay");
+const overlayCtx = overlayCanvas.getContext("2d");
 const startBtn = document.getElementById("startBtn");
 const stopBtn = document.getElementById("stopBtn");
+const renditionSelect = document.getElementById("renditionSelect");
 const deleteAllBtn = document.getElementById("deleteAllBtn");
 const deleteAllNotifBtn = document.getElementById("deleteAllNotifBtn");
 const notifElement = document.getElementById("notification");
@@ -20,7 +30,6 @@ const statusIndicatorEl = document.getElementById("statusIndicator");
 const alertBadgeEl = document.getElementById("alertBadge");
 
 let WS_URL_CAMERA = null;
-let WS_URL_STATS = null; // NEW: Stats WebSocket URL
 let WS_URL_NOTIF = null;
 
 // Fetch server info on page load
@@ -47,7 +56,6 @@ async function initializeConnection() {
 
     // Use the WebSocket URLs from API
     WS_URL_CAMERA = cameraInfo.websocket_url;
-    WS_URL_STATS = `ws://${cameraInfo.ip}:${cameraInfo.port}/ws/camera-stats`; // NEW
     WS_URL_NOTIF = notifInfo.websocket_url;
 
     statusElement.textContent = `✅ Connected to ${cameraInfo.ip}:${cameraInfo.port}`;
@@ -68,20 +76,25 @@ async function initializeConnection() {
 startBtn.onclick = () => {
   if (socket || !WS_URL_CAMERA) return;
 
-  console.log("📹 Connecting to:", WS_URL_CAMERA);
-  socket = new WebSocket(WS_URL_CAMERA);
+  // Overlay mode: clean JPEG + stats header + mask polygons on a single socket
+  const cameraUrl = `${WS_URL_CAMERA}?mode=overlay&rendition=${renditionSelect.value}`;
+  console.log("📹 Connecting to:", cameraUrl);
+  socket = new WebSocket(cameraUrl);
+  socket.binaryType = "arraybuffer";
 
   socket.onopen = () => {
     console.log("✅ Camera WebSocket connected");
     startBtn.disabled = true;
     stopBtn.disabled = false;
-
-    // Also connect to stats WebSocket
-    connectStats();
   };
 
   socket.onmessage = (event) => {
-    img.src = "data:image/jpeg;base64," + event.data;
+    if (typeof event.data === "string") {
+      // Legacy text frame
+      img.src = "data:image/jpeg;base64," + event.data;
+      return;
+    }
+    handleBinaryFrame(event.data);
   };
 
   socket.onerror = (error) => {
@@ -92,53 +105,117 @@ startBtn.onclick = () => {
     console.log("🔴 Camera WebSocket closed");
     socket = null;
     img.src = "";
+    clearOverlay();
+    if (frameUrl) {
+      URL.revokeObjectURL(frameUrl);
+      frameUrl = null;
+    }
     startBtn.disabled = false;
     stopBtn.disabled = true;
-
-    // Close stats socket too
-    if (statsSocket) {
-      statsSocket.close();
-    }
   };
 };
 
+// Switch video quality without reconnecting
+renditionSelect.onchange = () => {
+  if (socket && socket.readyState === WebSocket.OPEN) {
+    socket.send(JSON.stringify({ rendition: renditionSelect.value }));
+  }
+};
+
 stopBtn.onclick = () => {
   if (socket) {
     socket.close();
   }
-  if (statsSocket) {
-    statsSocket.close();
-  }
 };
 
-// NEW: Handle Stats WebSocket
-function connectStats() {
-  if (statsSocket || !WS_URL_STATS) return;
+// Parse a binary camera frame: fixed header + [overlay] + raw JPEG
+function handleBinaryFrame(buffer) {
+  const view = new DataView(buffer);
+  if (
+    buffer.byteLength < FRAME_HEADER_SIZE ||
+    view.getUint8(0) !== 0x57 || // "W"
+    view.getUint8(1) !== 0x46 // "F"
+  ) {
+    console.error("❌ Unknown camera frame");
+    return;
+  }
+
+  const flags = view.getUint8(3);
+  updateStatsDisplay({
+    larvae_count: view.getUint32(16, true),
+    density_cm2: view.getFloat32(20, true),
+    density_m2: view.getFloat32(24, true),
+    is_high_density: (flags & FLAG_HIGH_DENSITY) !== 0,
+  });
+
+  let jpegOffset = FRAME_HEADER_SIZE;
+  if (flags & FLAG_OVERLAY) {
+    const overlayLength = view.getUint32(FRAME_HEADER_SIZE, true);
+    drawOverlay(new DataView(buffer, FRAME_HEADER_SIZE + 4, overlayLength));
+    jpegOffset += 4 + overlayLength;
+  } else {
+    clearOverlay();
+  }
 
-  console.log("📊 Connecting to stats:", WS_URL_STATS);
-  statsSocket = new WebSocket(WS_URL_STATS);
+  const jpeg = new Blob([new Uint8Array(buffer, jpegOffset)], {
+    type: "image/jpeg",
+  });
+  const previousUrl = frameUrl;
+  frameUrl = URL.createObjectURL(jpeg);
+  img.src = frameUrl;
+  if (previousUrl) {
+    URL.revokeObjectURL(previousUrl);
+  }
+}
 
-  statsSocket.onopen = () => {
-    console.log("✅ Stats WebSocket connected");
+// Draw the mask overlay (see app/services/mask_overlay.py):
+// width, height, boxes (x1, y1, x2, y2), polygons (point count + x, y pairs), all u16
+function drawOverlay(view) {
+  let offset = 0;
+  const next = () => {
+    const value = view.getUint16(offset, true);
+    offset += 2;
+    return value;
   };
 
-  statsSocket.onmessage = (event) => {
-    try {
-      const stats = JSON.parse(event.data);
-      updateStatsDisplay(stats);
-    } catch (error) {
-      console.error("❌ Error parsing stats:", error);
+  const width = next();
+  const height = next();
+  if (overlayCanvas.width !== width || overlayCanvas.height !== height) {
+    overlayCanvas.width = width;
+    overlayCanvas.height = height;
+  }
+  overlayCtx.clearRect(0, 0, width, height);
+
+  const boxes = [];
+  const boxCount = next();
+  for (let i = 0; i < boxCount; i++) {
+    boxes.push([next(), next(), next(), next()]);
+  }
+
+  overlayCtx.fillStyle = OVERLAY_COLOR;
+  const polygonCount = next();
+  for (let i = 0; i < polygonCount; i++) {
+    const pointCount = next();
+    overlayCtx.beginPath();
+    for (let j = 0; j < pointCount; j++) {
+      const x = next();
+      const y = next();
+      if (j === 0) overlayCtx.moveTo(x, y);
+      else overlayCtx.lineTo(x, y);
     }
-  };
+    overlayCtx.closePath();
+    overlayCtx.fill();
+  }
 
-  statsSocket.onerror = (error) => {
-    console.error("❌ Stats WebSocket error:", error);
-  };
+  overlayCtx.strokeStyle = OVERLAY_BOX_COLOR;
+  overlayCtx.lineWidth = 2;
+  for (const [x1, y1, x2, y2] of boxes) {
+    overlayCtx.strokeRect(x1, y1, x2 - x1, y2 - y1);
+  }
+}
 
-  statsSocket.onclose = () => {
-    console.log("🔴 Stats WebSocket closed");
-    statsSocket = null;
-  };
+function clearOverlay() {
+  overlayCtx.clearRect(0, 0, overlayCanvas.width, overlayCanvas.height);
 }
 
 // NEW: Update stats display
@@ -242,6 +319,29 @@ function displayNotification(notification) {
   }, 3000);
 }
 
+// Poll a background job until it finishes, reporting progress
+async function waitForJob(statusUrl, onProgress) {
+  while (true) {
+    const response = await fetch(
+      `http://${location.hostname}:8000${statusUrl}`,
+    );
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const job = await response.json();
+    if (job.status === "done") return job.result;
+    if (job.status === "failed") throw new Error(job.error);
+
+    onProgress(job.progress);
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+  }
+}
+
+function formatProgress(progress) {
+  return progress.total ? `${progress.done}/${progress.total}` : "...";
+}
+
 // Handle Delete All Images
 deleteAllBtn.onclick = async () => {
   if (
@@ -271,11 +371,14 @@ deleteAllBtn.onclick = async () => {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const result = await response.json();
+    const job = await response.json();
+    const result = await waitForJob(job.status_url, (progress) => {
+      deleteStatusElement.textContent = `⏳ Deleting images ${formatProgress(progress)}`;
+    });
     console.log("🗑️ Delete result:", result);
 
     deleteStatusElement.className = "success";
-    deleteStatusElement.textContent = `✅ Successfully deleted ${result.total_images} images from storage and database!`;
+    deleteStatusElement.textContent = `✅ Successfully deleted ${result.deleted_from_db ?? 0} images from storage and database!`;
 
     setTimeout(() => {
       deleteStatusElement.style.display = "none";
@@ -324,7 +427,10 @@ deleteAllNotifBtn.onclick = async () => {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const result = await response.json();
+    const job = await response.json();
+    const result = await waitForJob(job.status_url, (progress) => {
+      deleteStatusElement.textContent = `⏳ Deleting notifications ${formatProgress(progress)}`;
+    });
     console.log("🔔 Delete result:", result);
 
     deleteStatusElement.className = "success";